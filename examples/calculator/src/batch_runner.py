@@ -0,0 +1,105 @@
+"""
+Batch Runner
+Headless streaming evaluation of expressions, one per line, without Qt.
+"""
+
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, TextIO
+
+from calculator_engine import CalculatorEngine
+
+
+DEFAULT_CHUNK_SIZE = 4096
+
+# Per-process engine used by pool workers
+_worker_engine = None
+
+
+def read_expressions(paths: List[str]) -> Iterator[str]:
+    """Yield expressions line by line from files ('-' or none means stdin)."""
+    for path in paths or ['-']:
+        if path == '-':
+            for line in sys.stdin:
+                yield line.rstrip('\r\n')
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    yield line.rstrip('\r\n')
+
+
+def chunked(lines: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    """Group lines into lists of at most chunk_size items."""
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    iterator = iter(lines)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _init_worker() -> None:
+    """Create the engine once per worker process."""
+    global _worker_engine
+    _worker_engine = CalculatorEngine()
+
+
+def _evaluate_chunk(chunk: List[str]) -> List[str]:
+    """Evaluate one chunk inside a worker process."""
+    return _worker_engine.evaluate_many(chunk)
+
+
+def evaluate_chunks(chunks: Iterable[List[str]], workers: int = 1) -> Iterator[List[str]]:
+    """Evaluate chunks in order, optionally fanned out to a process pool.
+
+    At most two chunks per worker are in flight, so memory stays bounded
+    regardless of input size while results are still yielded in order.
+    """
+    if workers <= 1:
+        engine = CalculatorEngine()
+        for chunk in chunks:
+            yield engine.evaluate_many(chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_evaluate_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def run_batch(paths: List[str], output: Optional[TextIO] = None, workers: int = 1,
+              chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Stream expressions from paths to output, one result per line."""
+    output = output or sys.stdout
+
+    # Answer interactive input line by line instead of waiting for a chunk
+    interactive = (not paths or '-' in paths) and sys.stdin.isatty()
+    if interactive:
+        chunk_size = 1
+
+    try:
+        for results in evaluate_chunks(chunked(read_expressions(paths), chunk_size), workers):
+            output.write('\n'.join(results) + '\n')
+            if interactive:
+                output.flush()
+        output.flush()
+    except BrokenPipeError:
+        # Downstream closed early (e.g. piped into head); silence the final flush
+        if output is sys.stdout:
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sys.stdout.fileno())
+        return 0
+    except OSError as e:
+        print(f"Error reading input: {e}", file=sys.stderr)
+        return 1
+
+    return 0
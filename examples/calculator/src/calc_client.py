@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Calculator Client
+Pooled asyncio client for the calculator server's line protocol.
+
+Usage: python src/calc_client.py --port 8765 --requests 100000   (load test)
+"""
+
+import argparse
+import asyncio
+import itertools
+import sys
+import time
+from collections import deque
+from typing import Iterable, List, Optional
+
+
+class _Connection:
+    """One persistent, pipelined connection."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Initialize connection and start reading responses."""
+        self.reader = reader
+        self.writer = writer
+        self.pending = deque()  # Futures awaiting responses, in request order
+        self._reader_task = asyncio.create_task(self._read_responses())
+
+    def send(self, expression: str) -> asyncio.Future:
+        """Pipeline one request; the future resolves to its result."""
+        if '\n' in expression or '\r' in expression:
+            raise ValueError("Expressions cannot contain line breaks")
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append(future)
+        self.writer.write((expression + '\n').encode('utf-8'))
+        return future
+
+    async def _read_responses(self) -> None:
+        """Resolve pending futures as result lines arrive."""
+        try:
+            async for line in self.reader:
+                if not self.pending:
+                    continue  # Nothing was asked for this line; ignore it
+                future = self.pending.popleft()
+                if not future.done():  # The caller may have cancelled or timed out
+                    future.set_result(line.decode('utf-8').rstrip('\n'))
+        except ConnectionError:
+            pass
+        error = ConnectionError("Connection to calculator server closed")
+        while self.pending:
+            future = self.pending.popleft()
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self) -> None:
+        """Close the connection and stop reading."""
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._reader_task
+
+
+class CalculatorClient:
+    """Client holding a pool of persistent connections to the server."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 8765,
+                 path: Optional[str] = None, pool_size: int = 4):
+        """Initialize client; call connect() (or use async with) before use."""
+        self.host = host
+        self.port = port
+        self.path = path
+        self.pool_size = pool_size
+        self._connections = []
+        self._next = None
+
+    async def connect(self) -> 'CalculatorClient':
+        """Open the pooled connections."""
+        for _ in range(self.pool_size):
+            if self.path:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            self._connections.append(_Connection(reader, writer))
+        self._next = itertools.cycle(self._connections)
+        return self
+
+    async def close(self) -> None:
+        """Close every pooled connection."""
+        for connection in self._connections:
+            await connection.close()
+        self._connections = []
+
+    async def __aenter__(self) -> 'CalculatorClient':
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def evaluate(self, expression: str) -> str:
+        """Evaluate one expression on the next pooled connection."""
+        connection = next(self._next)
+        future = connection.send(expression)
+        await connection.writer.drain()
+        return await future
+
+    async def evaluate_many(self, expressions: Iterable[str]) -> List[str]:
+        """Pipeline expressions across the pool; results keep input order."""
+        futures = [next(self._next).send(expression) for expression in expressions]
+        for connection in self._connections:
+            await connection.writer.drain()
+        return list(await asyncio.gather(*futures))
+
+
+async def _load_test(args) -> None:
+    """Measure requests/sec and latency percentiles against a running server."""
+    expressions = [f"({i % 97} + 2.5) * {i % 13} / 4" for i in range(args.batch)]
+    latencies = []
+
+    async with CalculatorClient(args.host, args.port, args.unix, args.pool) as client:
+        start = time.perf_counter()
+        for _ in range(max(1, args.requests // args.batch)):
+            sent = time.perf_counter()
+            await client.evaluate_many(expressions)
+            latencies.append(time.perf_counter() - sent)
+        elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    total = len(latencies) * args.batch
+    print(f"{total:,} requests in {elapsed:.2f}s: {total / elapsed:,.0f} req/s")
+    print(f"batch round trip p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000:.2f} ms")
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Calculator server load test")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--unix", metavar="PATH", help="Connect to a Unix socket instead of TCP")
+    parser.add_argument("--pool", type=int, default=4, help="Pooled connections (default: 4)")
+    parser.add_argument("--requests", type=int, default=100000, help="Total requests (default: 100000)")
+    parser.add_argument("--batch", type=int, default=1000, help="Requests in flight per round (default: 1000)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_load_test(args))
+    except ConnectionError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
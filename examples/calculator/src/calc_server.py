@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Calculator Server
+Local asyncio evaluation service that coalesces pipelined requests from all
+connections into micro-batches for one shared CalculatorEngine.
+
+Protocol: UTF-8 lines. Each request line is an expression; each response
+line is its result, in request order per connection.
+
+Usage: python src/calc_server.py --port 8765   (or --unix /tmp/calc.sock)
+"""
+
+import argparse
+import asyncio
+import sys
+from typing import Dict, Optional
+
+from calculator_engine import CalculatorEngine
+
+
+DEFAULT_MAX_BATCH = 512
+DEFAULT_MAX_DELAY = 0.0005  # Seconds a request may wait for its batch to fill
+
+# Requests per connection read ahead of their responses; beyond this,
+# reading waits for the writer, so a client that never reads is throttled
+MAX_IN_FLIGHT = 1024
+
+# Responses written between waits for the transport buffer to drain
+DRAIN_INTERVAL = 64
+
+
+class MicroBatcher:
+    """Collects expressions and evaluates them in batches on the event loop."""
+
+    def __init__(self, engine: CalculatorEngine, max_batch: int = DEFAULT_MAX_BATCH,
+                 max_delay: float = DEFAULT_MAX_DELAY):
+        """Initialize batcher.
+
+        Args:
+            engine: Engine used for evaluate_many
+            max_batch: Batch size that triggers an immediate flush
+            max_delay: Longest time a request waits before its batch is flushed
+        """
+        self.engine = engine
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.requests = 0
+        self._expressions = []
+        self._futures = []
+        self._timer = None
+
+    def submit(self, expression: str) -> asyncio.Future:
+        """Queue an expression; the future resolves to its formatted result."""
+        future = asyncio.get_running_loop().create_future()
+        self._expressions.append(expression)
+        self._futures.append(future)
+
+        if len(self._expressions) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self.flush)
+        return future
+
+    def flush(self) -> None:
+        """Evaluate everything queued so far."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._expressions:
+            return
+
+        expressions, futures = self._expressions, self._futures
+        self._expressions, self._futures = [], []
+        self.batches += 1
+        self.requests += len(expressions)
+
+        for future, result in zip(futures, self.engine.evaluate_many(expressions)):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, float]:
+        """Return request and batch counters."""
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch_size': self.requests / self.batches if self.batches else 0.0,
+        }
+
+
+class CalculatorServer:
+    """Line-protocol evaluation server over TCP or a Unix socket."""
+
+    def __init__(self, engine: Optional[CalculatorEngine] = None,
+                 max_batch: int = DEFAULT_MAX_BATCH, max_delay: float = DEFAULT_MAX_DELAY):
+        """Initialize server with a shared engine."""
+        self.engine = engine or CalculatorEngine()
+        self.batcher = MicroBatcher(self.engine, max_batch, max_delay)
+        self._server = None
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0,
+                    path: Optional[str] = None):
+        """Start listening; returns the bound (host, port) or socket path."""
+        if path:
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+            return path
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled."""
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop accepting connections and flush queued requests."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.batcher.flush()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Read pipelined requests and hand their futures to the writer."""
+        pending = asyncio.Queue(MAX_IN_FLIGHT)
+        responder = asyncio.create_task(self._respond(writer, pending))
+        try:
+            async for line in reader:
+                await pending.put(self.batcher.submit(line.decode('utf-8', 'replace').rstrip('\r\n')))
+        except (ConnectionError, ValueError):
+            # Peer went away or sent a line beyond the stream limit
+            pass
+        finally:
+            await pending.put(None)
+            await responder
+
+    async def _respond(self, writer: asyncio.StreamWriter, pending: asyncio.Queue) -> None:
+        """Write results in request order, draining every DRAIN_INTERVAL writes and when idle.
+
+        Once the peer is gone the remaining futures are still consumed, so
+        the reader never blocks on a full queue.
+        """
+        connected = True
+        written = 0
+        try:
+            while True:
+                future = await pending.get()
+                if future is None:
+                    break
+                result = await future
+                if not connected:
+                    continue
+                try:
+                    writer.write((result + '\n').encode('utf-8'))
+                    written += 1
+                    if pending.empty() or written % DRAIN_INTERVAL == 0:
+                        await writer.drain()
+                except ConnectionError:
+                    connected = False
+        finally:
+            writer.close()
+
+
+async def _serve(args) -> None:
+    """Run the server until interrupted."""
+    server = CalculatorServer(CalculatorEngine(), args.max_batch, args.max_delay_ms / 1000)
+    address = await server.start(args.host, args.port, args.unix)
+    print(f"Calculator server listening on {address}", file=sys.stderr)
+    await server.serve_forever()
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Local calculator evaluation server")
+    parser.add_argument("--host", default="127.0.0.1", help="TCP host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="TCP port (default: 8765)")
+    parser.add_argument("--unix", metavar="PATH", help="Listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH,
+                        help=f"Requests per micro-batch (default: {DEFAULT_MAX_BATCH})")
+    parser.add_argument("--max-delay-ms", type=float, default=DEFAULT_MAX_DELAY * 1000,
+                        help=f"Max wait for a batch to fill (default: {DEFAULT_MAX_DELAY * 1000} ms)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
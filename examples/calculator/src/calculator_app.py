@@ -3,25 +3,143 @@ Calculator App
 Main application window with UI components and event handling.
 """
 
-from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
+from time import perf_counter_ns
+from typing import Dict, List, Optional
+
+from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QGridLayout, QPushButton, QLineEdit, QComboBox,
                             QLabel, QFrame)
-from PyQt6.QtCore import Qt, QTimer
-from PyQt6.QtGui import QFont, QKeySequence, QShortcut
+from PyQt6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from PyQt6.QtGui import QFont, QKeySequence, QScreen, QShortcut
 
 from calculator_engine import CalculatorEngine
+from engine_metrics import EngineMetrics
+from expression_parser import NAME_START, ExpressionError, tokenize
+
+
+# Window stylesheet; buttons are matched by their 'kind' property
+APP_STYLESHEET = """
+    QLineEdit#inputField, QLabel#resultField {
+        background-color: black;
+        color: white;
+        border: 1px solid #666;
+        padding: 5px;
+    }
+    QPushButton[kind="number"] {
+        background-color: #f0f0f0;
+        color: black;
+        border: 1px solid #ccc;
+        border-radius: 8px;
+    }
+    QPushButton[kind="number"]:hover {
+        background-color: #e0e0e0;
+    }
+    QPushButton[kind="number"]:pressed {
+        background-color: #d0d0d0;
+    }
+    QPushButton[kind="operator"] {
+        background-color: #ff9500;
+        color: black;
+        border: 1px solid #e6860e;
+        border-radius: 8px;
+    }
+    QPushButton[kind="operator"]:hover {
+        background-color: #e6860e;
+    }
+    QPushButton[kind="operator"]:pressed {
+        background-color: #cc7a0d;
+    }
+    QPushButton[kind="function"] {
+        background-color: #a6a6a6;
+        color: black;
+        border: 1px solid #8c8c8c;
+        border-radius: 8px;
+    }
+    QPushButton[kind="function"]:hover {
+        background-color: #8c8c8c;
+    }
+    QPushButton[kind="function"]:pressed {
+        background-color: #737373;
+    }
+"""
+
+# Most recent entries listed by history_items
+RECALL_ITEMS = 10
+
+# Longest input evaluated inline on the GUI thread; longer input goes to a worker
+INLINE_MAX_LENGTH = 32
+
+# Worker evaluations cheaper than one frame are never debounced
+FRAME_MS = 16.0
+
+# Upper bound on the debounce delay, however slow evaluation gets
+MAX_DEBOUNCE_MS = 250
+
+# Weight of the newest sample in the rolling cost and cadence estimates
+SMOOTHING = 0.3
+
+
+class _ResultSignal(QObject):
+    """Delivers worker results to the GUI thread through a queued connection."""
+    
+    ready = pyqtSignal(int, str, float)  # Input generation, formatted result, evaluation ms
+
+
+class _EvaluationTask(QRunnable):
+    """Evaluates one input on a pool thread unless newer input arrived first."""
+    
+    def __init__(self, app: 'CalculatorApp', expression: str, generation: int):
+        """Initialize task for the input of the given generation."""
+        super().__init__()
+        self.app = app
+        self.expression = expression
+        self.generation = generation
+    
+    def run(self):
+        """Evaluate on the worker session and report the result."""
+        if self.generation != self.app.generation:
+            return
+        start = perf_counter_ns()
+        result = self.app.worker_session.update(self.expression)
+        self.app.result_signal.ready.emit(self.generation, result, (perf_counter_ns() - start) / 1e6)
 
 
 class CalculatorApp(QMainWindow):
     """Main calculator application window."""
     
-    def __init__(self):
-        """Initialize the calculator application."""
+    def __init__(self, history_path: Optional[str] = None):
+        """Initialize the calculator application.
+        
+        Args:
+            history_path: History database (see HistoryStore; ':memory:' keeps nothing)
+        """
         super().__init__()
         
         # Initialize core components
         self.engine = CalculatorEngine()
-        self.history_items = []  # Simple in-memory history (max 10 items)
+        self.session = self.engine.session()  # Incremental keystroke evaluation
+        self.history_path = history_path
+        self._history = None  # Opened on first use (see history)
+        self.calculations = self.engine.calculation_graph()  # Saved results by name, loaded on reference
+        self.recalled_name = None  # Saving after a recall updates that entry
+        
+        # Off-GUI-thread evaluation; one worker so its session is never shared
+        self.worker_session = self.engine.session()
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.generation = 0  # Bumped on every input change to invalidate older work
+        self.result_signal = _ResultSignal(self)
+        self.result_signal.ready.connect(self.on_worker_result)
+        
+        # Adaptive debounce of worker evaluations
+        self.calc_timer = QTimer(self)
+        self.calc_timer.setSingleShot(True)
+        self.calc_timer.timeout.connect(self.dispatch_pending)
+        self.pending_expression = ""
+        self.evaluation_cost_ms = 0.0  # Rolling estimate of one worker evaluation
+        self.keystroke_interval_ms = float(MAX_DEBOUNCE_MS)  # Rolling typing cadence
+        self.last_change_ns = None
+        self.ui_metrics = EngineMetrics()  # 'keystroke_to_result' and 'worker_evaluate' latencies
         
         # UI state
         self.current_expression = ""
@@ -31,11 +149,6 @@ class CalculatorApp(QMainWindow):
         self.init_ui()
         self.setup_keyboard_shortcuts()
         
-        # Setup real-time calculation timer
-        self.calc_timer = QTimer()
-        self.calc_timer.setSingleShot(True)
-        self.calc_timer.timeout.connect(self.update_result)
-        
         # Initialize display
         self.reset_calculator()
     
@@ -47,9 +160,10 @@ class CalculatorApp(QMainWindow):
         # Set window properties for better macOS behavior
         self.setWindowFlags(Qt.WindowType.Window | Qt.WindowType.WindowCloseButtonHint | Qt.WindowType.WindowMinimizeButtonHint)
         
+        # One stylesheet for the whole window, parsed once instead of per widget
+        self.setStyleSheet(APP_STYLESHEET)
+        
         # Center window on screen
-        from PyQt6.QtGui import QScreen
-        from PyQt6.QtWidgets import QApplication
         screen = QScreen.availableGeometry(QApplication.primaryScreen())
         x = (screen.width() - self.width()) // 2
         y = (screen.height() - self.height()) // 2
@@ -89,14 +203,7 @@ class CalculatorApp(QMainWindow):
         self.input_field.setFont(QFont("Monaco", 14))  # Monospace font
         self.input_field.setMaxLength(60)
         self.input_field.setAlignment(Qt.AlignmentFlag.AlignLeft)
-        self.input_field.setStyleSheet("""
-            QLineEdit {
-                background-color: black;
-                color: white;
-                border: 1px solid #666;
-                padding: 5px;
-            }
-        """)
+        self.input_field.setObjectName('inputField')
         self.input_field.textChanged.connect(self.on_input_changed)
         self.input_field.cursorPositionChanged.connect(self.on_cursor_changed)
         
@@ -120,14 +227,7 @@ class CalculatorApp(QMainWindow):
         self.result_field.setFont(QFont("Monaco", 14))
         self.result_field.setAlignment(Qt.AlignmentFlag.AlignLeft)
         self.result_field.setMinimumHeight(30)
-        self.result_field.setStyleSheet("""
-            QLabel { 
-                color: white; 
-                background-color: black;
-                padding: 5px;
-                border: 1px solid #666;
-            }
-        """)
+        self.result_field.setObjectName('resultField')
         
         result_layout.addWidget(self.result_field, 1)
         parent_layout.addWidget(result_frame)
@@ -183,8 +283,9 @@ class CalculatorApp(QMainWindow):
             (')', 6, 3, 1, 1, 'operator'), # Close parenthesis - full width
         ]
         
-        # Create buttons
+        # Create buttons (styled by the window stylesheet through their 'kind')
         self.buttons = {}
+        button_font = QFont("Arial", 16)
         for button_info in buttons:
             text, row, col, row_span, col_span, button_type = button_info
             
@@ -192,57 +293,10 @@ class CalculatorApp(QMainWindow):
             if button_type == 'empty' or text == '':
                 continue
             
-                
             button = QPushButton(text)
             button.setMinimumHeight(60)
-            button.setFont(QFont("Arial", 16))
-            
-            # Style buttons by type (with black text)
-            if button_type == 'number':
-                button.setStyleSheet("""
-                    QPushButton {
-                        background-color: #f0f0f0;
-                        color: black;
-                        border: 1px solid #ccc;
-                        border-radius: 8px;
-                    }
-                    QPushButton:hover {
-                        background-color: #e0e0e0;
-                    }
-                    QPushButton:pressed {
-                        background-color: #d0d0d0;
-                    }
-                """)
-            elif button_type == 'operator':
-                button.setStyleSheet("""
-                    QPushButton {
-                        background-color: #ff9500;
-                        color: black;
-                        border: 1px solid #e6860e;
-                        border-radius: 8px;
-                    }
-                    QPushButton:hover {
-                        background-color: #e6860e;
-                    }
-                    QPushButton:pressed {
-                        background-color: #cc7a0d;
-                    }
-                """)
-            elif button_type == 'function':
-                button.setStyleSheet("""
-                    QPushButton {
-                        background-color: #a6a6a6;
-                        color: black;
-                        border: 1px solid #8c8c8c;
-                        border-radius: 8px;
-                    }
-                    QPushButton:hover {
-                        background-color: #8c8c8c;
-                    }
-                    QPushButton:pressed {
-                        background-color: #737373;
-                    }
-                """)
+            button.setFont(button_font)
+            button.setProperty('kind', button_type)
             
             # Connect button click
             button.clicked.connect(lambda checked, t=text: self.on_button_click(t))
@@ -279,7 +333,7 @@ class CalculatorApp(QMainWindow):
     
     def insert_character(self, char: str):
         """Insert character at cursor position."""
-        if not self.engine.is_valid_input_character(char):
+        if not self.engine.is_valid_input_character(char, allow_variables=True):
             return
         
         current_text = self.input_field.text()
@@ -302,8 +356,8 @@ class CalculatorApp(QMainWindow):
     def on_input_changed(self):
         """Handle input field text changes."""
         try:
-            # Trigger calculation with small delay for real-time feedback
-            self.calc_timer.start(100)  # 100ms delay
+            # Evaluate on every keystroke; long input is handed to the worker thread
+            self.update_result()
         except Exception as e:
             print(f"Error in input change handler: {e}")
             self.result_field.setText("?")
@@ -313,24 +367,84 @@ class CalculatorApp(QMainWindow):
         self.cursor_position = self.input_field.cursorPosition()
     
     def update_result(self):
-        """Update the result display based on current input."""
+        """Update the result display based on current input.
+        
+        Short input is evaluated inline; longer input is handed to the worker
+        thread so typing never waits on it, after the debounce delay when
+        evaluation is slow. Every change starts a new generation: queued work
+        for older input is dropped, work in flight is cancelled and any result
+        it still delivers is ignored.
+        """
         try:
+            now = perf_counter_ns()
+            if self.last_change_ns is not None:
+                interval = min((now - self.last_change_ns) / 1e6, MAX_DEBOUNCE_MS)
+                self.keystroke_interval_ms += SMOOTHING * (interval - self.keystroke_interval_ms)
+            self.last_change_ns = now
+            
+            self.generation += 1
+            self.calc_timer.stop()
+            self.pool.clear()
+            self.worker_session.cancel()
+            
             expression = self.input_field.text().strip()
             
             if not expression:
                 self.result_field.setText("0")
                 return
             
-            result = self.engine.evaluate_expression(expression)
-            self.result_field.setText(str(result))
+            if any(char in NAME_START for char in expression):
+                # References to saved results are resolved through the graph
+                self._load_references(expression)
+                result = self.calculations.evaluate(expression)
+            elif len(expression) <= INLINE_MAX_LENGTH:
+                result = self.session.update(expression)
+            else:
+                self.pending_expression = expression
+                delay = self.debounce_delay()
+                if delay:
+                    self.calc_timer.start(delay)
+                else:
+                    self.dispatch_pending()
+                return
+            self.show_result(str(result))
         except Exception as e:
             print(f"Error updating result: {e}")
             self.result_field.setText("?")
     
+    def debounce_delay(self) -> int:
+        """Return how long to wait (ms) before evaluating long input on the worker.
+        
+        Evaluations cheaper than a frame, or slower typing than evaluation,
+        go out at once. Otherwise waiting a little longer than the typical
+        gap between keystrokes coalesces a burst of edits into one evaluation.
+        """
+        if self.evaluation_cost_ms < FRAME_MS or self.keystroke_interval_ms > self.evaluation_cost_ms:
+            return 0
+        return int(min(self.keystroke_interval_ms * 1.5, MAX_DEBOUNCE_MS))
+    
+    def dispatch_pending(self):
+        """Hand the current long input to the worker thread."""
+        self.pool.start(_EvaluationTask(self, self.pending_expression, self.generation))
+    
+    def on_worker_result(self, generation: int, result: str, elapsed_ms: float):
+        """Show a worker result unless the input changed since it was dispatched."""
+        if generation != self.generation:
+            return
+        self.evaluation_cost_ms += SMOOTHING * (elapsed_ms - self.evaluation_cost_ms)
+        self.ui_metrics.observe('worker_evaluate', int(elapsed_ms * 1e6))
+        self.show_result(result)
+    
+    def show_result(self, result: str):
+        """Display a result and record the latency since the input changed."""
+        self.result_field.setText(result)
+        self.ui_metrics.observe('keystroke_to_result', perf_counter_ns() - self.last_change_ns)
+    
     def reset_calculator(self):
         """Reset calculator to initial state."""
         self.input_field.clear()
         self.result_field.setText("0")
+        self.recalled_name = None
         self.input_field.setFocus()
     
     def save_current_calculation(self):
@@ -339,30 +453,24 @@ class CalculatorApp(QMainWindow):
         result = self.result_field.text()
         
         if expression and result != "0":
-            self._save_calculation(expression, result)
+            self._save_calculation(expression, self.recalled_name)
     
     def show_recall_menu(self):
-        """Show recall menu with saved calculations."""
-        if not self.history_items:
-            return
-        
-        # Create dropdown menu (simplified - using dialog for now)
-        # In a full implementation, this would be a proper dropdown
-        from PyQt6.QtWidgets import QInputDialog
-        
-        items = [f"{item['expression']} = {item['result']}" for item in self.history_items]
+        """Show the searchable recall list of saved calculations."""
+        from recall_view import RecallDialog
         
-        item, ok = QInputDialog.getItem(
-            self, 'Recall Calculation', 'Select calculation:', items, 0, False
-        )
+        dialog = RecallDialog(self.history, self)
+        if not dialog.model.rowCount():
+            return
         
-        if ok and item:
-            # Find selected history item
-            selected_index = items.index(item)
-            selected_item = self.history_items[selected_index]
+        if dialog.exec():
+            selected_item = dialog.selected_item()
+            if selected_item is None:
+                return
             
-            # Load expression into input field
+            # Load expression into input field; saving it again edits the entry
             self.input_field.setText(selected_item['expression'])
+            self.recalled_name = selected_item['name']
             self.input_field.setFocus()
     
     def keyPressEvent(self, event):
@@ -378,7 +486,7 @@ class CalculatorApp(QMainWindow):
                 return
             
             # Handle character input
-            if text and self.engine.is_valid_input_character(text):
+            if text and self.engine.is_valid_input_character(text, allow_variables=True):
                 # Let the input field handle it naturally
                 super().keyPressEvent(event)
             else:
@@ -388,14 +496,78 @@ class CalculatorApp(QMainWindow):
             print(f"Error in key press handler: {e}")
             event.ignore()
     
-    def _save_calculation(self, expression: str, result: str) -> None:
-        """Save calculation to in-memory history (max 10 items)."""
-        # Create history item
-        item = {'expression': expression, 'result': result}
+    @property
+    def history(self) -> 'HistoryStore':
+        """Persistent history, opened on first use to keep startup fast."""
+        if self._history is None:
+            from history_store import HistoryStore
+            self._history = HistoryStore(self.history_path)
+        return self._history
+    
+    @property
+    def history_items(self) -> List[Dict]:
+        """Most recent saved calculations, newest first (at most RECALL_ITEMS)."""
+        return self.history.recent(RECALL_ITEMS)
+    
+    def closeEvent(self, event):
+        """Close the history database with the window."""
+        if self._history is not None:
+            self._history.close()
+        super().closeEvent(event)
+    
+    def _save_calculation(self, expression: str, name: Optional[str] = None) -> None:
+        """Save calculation to the persistent history.
+        
+        Each calculation is stored under a name (r1, r2, ...) that later
+        expressions can reference. The stored result is the one the
+        calculation graph computes for it. Saving under an existing name edits
+        that entry and refreshes the stored results of loaded entries depending on it.
+        """
+        if name is None:
+            name = self.history.next_name()
+        self._load_references(expression)
+        try:
+            result = self.calculations.set(name, expression)
+        except ExpressionError:
+            # A circular reference keeps the previous definition
+            return
         
-        # Add to front of list (most recent first)
-        self.history_items.insert(0, item)
+        # Saving moves the entry to the front (most recent first); entries
+        # beyond the store's retention are dropped
+        self.history.append(expression, result, name)
         
-        # Keep only last 10 items
-        if len(self.history_items) > 10:
-            self.history_items = self.history_items[:10]
\ No newline at end of file
+        # Entries downstream of an edit were recomputed by the graph
+        for dependent in self.calculations.dependents(name):
+            self.history.update_result(dependent, self.calculations.result(dependent))
+    
+    def _load_references(self, expression: str) -> None:
+        """Define saved entries referenced by expression, and theirs, in the graph.
+        
+        Only entries actually referenced are read, so startup never pays
+        for the size of the history.
+        """
+        pending = list(self._references(expression))
+        found = []
+        seen = set()
+        while pending:
+            name = pending.pop()
+            if name in self.calculations or name in seen:
+                continue
+            seen.add(name)
+            item = self.history.get(name)
+            if item is not None:
+                found.append((name, item['expression']))
+                pending.extend(self._references(item['expression']))
+        
+        # Referenced entries were found before their own references
+        for name, saved_expression in reversed(found):
+            self.calculations.set(name, saved_expression)
+    
+    @staticmethod
+    def _references(expression: str) -> List[str]:
+        """Return the names an expression references (none if it does not tokenize)."""
+        try:
+            return [token for token in tokenize(expression, allow_variables=True)
+                    if token[0] in NAME_START]
+        except ExpressionError:
+            return []
\ No newline at end of file
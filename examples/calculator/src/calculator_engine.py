@@ -1,23 +1,184 @@
 """
 Calculator Engine
-Simple and safe calculation logic using sanitized eval.
+Simple and safe calculation logic using a dedicated expression parser.
 """
 
+import decimal
+import operator
 import re
-from typing import Union
+from collections import OrderedDict
+from fractions import Fraction
+from itertools import repeat
+from time import perf_counter_ns
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from expression_parser import (BINARY_OPERATORS, LITERAL_PATTERN, NAME_START, NEGATE,
+                               NUMBER, POSITIVE, VARIABLE, BudgetedParser, BudgetExceeded,
+                               EvaluationBudget, ExpressionError, ExpressionParser,
+                               FoldingParser, MemoizingParser, evaluate_tree,
+                               evaluate_tree_columns,
+                               has_shape_sensitive_literal, literal_shape, tokenize)
+from engine_metrics import EngineMetrics
+from numeric_backends import (FLOAT, create_backend, format_exact, format_integer,
+                              format_scientific, is_integer_only)
+
+
+# Smallest group of same-shaped expressions worth evaluating with NumPy
+VECTORIZE_MIN_GROUP = 16
+
+# Longest shape evaluated with NumPy; its column evaluation is recursive
+VECTORIZE_MAX_TOKENS = 256
+
+# Result shown when an expression exceeds the engine's evaluation budget
+TOO_COMPLEX = "Too Complex"
+
+# Default magnitude from which results are shown in scientific notation
+SCIENTIFIC_THRESHOLD = 1e21
+
+
+def _load_numpy():
+    """Import NumPy on demand so the engine stays cheap to import."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
 
 
 class CalculatorEngine:
     """Simple calculator engine with safe expression evaluation."""
     
-    def __init__(self):
-        """Initialize calculator engine."""
-        self.max_decimal_places = 8
-        self.min_representable = 1e-8
+    def __init__(self, cache_size: int = 0, backend: str = FLOAT,
+                 decimal_context: Optional[decimal.Context] = None,
+                 budget: Optional[EvaluationBudget] = None):
+        """Initialize calculator engine.
+        
+        Args:
+            cache_size: Maximum number of memoized results (0 disables caching)
+            backend: Numeric backend - 'float', 'decimal' or 'fraction'
+            decimal_context: Precision/rounding context for the decimal backend
+            budget: Per-expression cost limits (default: EvaluationBudget())
+        """
+        # Result cache keyed on canonical expressions, least recently used first
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+        
+        # Redundant work skipped by the last shared-subexpression batch
+        self._batch_stats = {}
+        
+        # Opt-in instrumentation (see enable_metrics)
+        self._metrics = None
+        
+        self._max_decimal_places = 8
+        self._min_representable = 1e-8
+        self._scientific_threshold = SCIENTIFIC_THRESHOLD
+        self._decimal_context = decimal_context
+        self._backend = create_backend(backend, decimal_context)
+        self._budget = budget or EvaluationBudget()
+    
+    @property
+    def backend(self) -> str:
+        """Numeric backend name: 'float', 'decimal' or 'fraction'."""
+        return self._backend.name
+    
+    @backend.setter
+    def backend(self, name: str) -> None:
+        self._backend = create_backend(name, self._decimal_context)
+        self.clear_cache()
+    
+    @property
+    def budget(self) -> EvaluationBudget:
+        """Limits on nesting, operand size and operations per expression."""
+        return self._budget
+    
+    @budget.setter
+    def budget(self, value: EvaluationBudget) -> None:
+        self._budget = value
+        self.clear_cache()
+    
+    @property
+    def max_decimal_places(self) -> int:
+        """Maximum decimal places shown in formatted results."""
+        return self._max_decimal_places
+    
+    @max_decimal_places.setter
+    def max_decimal_places(self, value: int) -> None:
+        self._max_decimal_places = value
+        self.clear_cache()
+    
+    @property
+    def min_representable(self) -> float:
+        """Smallest non-zero magnitude shown before reporting Too Small."""
+        return self._min_representable
+    
+    @min_representable.setter
+    def min_representable(self, value: float) -> None:
+        self._min_representable = value
+        self.clear_cache()
+    
+    @property
+    def scientific_threshold(self) -> float:
+        """Magnitude from which results are shown in scientific notation."""
+        return self._scientific_threshold
+    
+    @scientific_threshold.setter
+    def scientific_threshold(self, value: float) -> None:
+        self._scientific_threshold = value
+        self.clear_cache()
     
-    def is_valid_input_character(self, char: str) -> bool:
-        """Check if character is allowed in calculator input."""
-        return char in '0123456789+-*/.() '
+    def clear_cache(self) -> None:
+        """Drop all memoized results (counters are kept)."""
+        self._cache.clear()
+    
+    def cache_info(self) -> Dict[str, int]:
+        """Return result cache statistics."""
+        return {
+            'hits': self.cache_hits,
+            'misses': self.cache_misses,
+            'evictions': self.cache_evictions,
+            'size': len(self._cache),
+            'max_size': self.cache_size,
+        }
+    
+    def canonicalize_expression(self, expression: str) -> str:
+        """Return the canonical form of expression used as the cache key.
+        
+        Whitespace is removed, display operators are mapped and implicit
+        multiplication is expanded, so '2 (3)' and '2*(3)' share a key.
+        """
+        return ''.join(tokenize(expression))
+    
+    def is_valid_input_character(self, char: str, allow_variables: bool = False) -> bool:
+        """Check if character is allowed in calculator input.
+        
+        With allow_variables, ASCII letters and underscores used in variable
+        names (see compile) are accepted too.
+        """
+        if char in '0123456789+-*/.() ':
+            return True
+        return allow_variables and char in NAME_START
+    
+    def compile(self, expression: str) -> 'CompiledExpression':
+        """Compile an expression with named variables for repeated evaluation.
+        
+        Compiled expressions use float semantics regardless of the backend
+        so they can be evaluated over NumPy arrays. Parsing is held to the
+        engine's budget.
+        
+        Raises:
+            ExpressionError: If the expression is not valid
+            BudgetExceeded: If it is too long, nests too deeply or has too many operations
+        """
+        tokens = tokenize(expression, allow_variables=True, budget=self._budget)
+        tree = BudgetedParser(tokens, budget=self._budget).parse()
+        try:
+            return CompiledExpression(self, expression, tree)
+        except RecursionError:
+            # Operator chains within the budget can still nest past the stack limit
+            raise BudgetExceeded("Expression nested too deeply") from None
     
     def validate_expression(self, expression: str) -> bool:
         """Validate if expression contains only allowed characters and is balanced."""
@@ -36,39 +197,398 @@ class CalculatorEngine:
         if not expression or not expression.strip():
             return "?"
         
-        clean_expr = expression.strip()
-        
-        if not self.validate_expression(clean_expr):
+        try:
+            # Single-pass lex; the canonical token string doubles as cache key
+            tokens = tokenize(expression, budget=self._budget)
+        except BudgetExceeded:
+            return TOO_COMPLEX
+        except ValueError:
             return "?"
         
+        if not self.cache_size:
+            return self._evaluate_tokens(tokens)
+        
+        key = ''.join(tokens)
+        result = self._cache_get(key)
+        if result is None:
+            result = self._evaluate_tokens(tokens)
+            self._cache_put(key, result)
+        return result
+    
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Look up a cached result, counting the hit or miss."""
+        result = self._cache.get(key)
+        if result is None:
+            self.cache_misses += 1
+            return None
+        self._cache.move_to_end(key)
+        self.cache_hits += 1
+        return result
+    
+    def _cache_put(self, key: str, result: str) -> None:
+        """Store a result, evicting the least recently used beyond cache_size."""
+        cache = self._cache
+        cache[key] = result
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+            self.cache_evictions += 1
+    
+    def _compute(self, tokens: List[str],
+                 variables: Optional[dict] = None) -> Union[int, float, decimal.Decimal, Fraction]:
+        """Parse and evaluate canonical tokens into an unformatted value.
+        
+        Args:
+            tokens: Canonical tokens, including names when variables is given
+            variables: Raw values from this backend substituted for names
+        """
+        # Operations are folded while parsing (no eval/compile) within the
+        # budget; exact backends are only needed when a literal, division
+        # or substituted value could be inexact
+        backend = self._backend
+        if backend.name == FLOAT or (variables is None and is_integer_only(tokens)):
+            return FoldingParser(tokens, budget=self._budget, variables=variables).parse()[1]
+        with backend.activate():
+            parser = FoldingParser(tokens, backend.parse_literal, backend.operators,
+                                   self._budget, variables)
+            return parser.parse()[1]
+    
+    def _evaluate_tokens(self, tokens: List[str]) -> str:
+        """Parse and evaluate canonical tokens into a formatted result."""
         try:
-            # Sanitize expression - only allow safe mathematical operations
-            clean_expr = self._sanitize_expression(clean_expr)
-            
-            # Evaluate safely
-            result = eval(clean_expr, {"__builtins__": {}}, {})
-            
-            # Handle special cases
-            if isinstance(result, (int, float)):
-                if abs(result) < self.min_representable and result != 0:
-                    return "Too Small"
-                
-                # Format result
-                if isinstance(result, float):
-                    formatted = f"{result:.{self.max_decimal_places}f}".rstrip('0').rstrip('.')
-                    if '.' not in formatted and abs(result) < 1e15:
-                        return str(int(result))
-                    return formatted
-                else:
-                    return str(result)
-            
-            return str(result)
+            return self._format_result(self._compute(tokens))
             
+        except BudgetExceeded:
+            return TOO_COMPLEX
         except (SyntaxError, ValueError, TypeError, ZeroDivisionError, OverflowError):
             return "?"
         except Exception:
             return "?"
     
+    @property
+    def metrics(self) -> Optional[EngineMetrics]:
+        """Recorded instrumentation, or None while disabled."""
+        return self._metrics
+    
+    def enable_metrics(self, metrics: Optional[EngineMetrics] = None) -> EngineMetrics:
+        """Start recording per-phase latencies and result counters.
+        
+        Instrumented versions of the public entry points are installed on
+        this instance only, so a disabled engine runs the plain methods with
+        no extra checks at all.
+        """
+        self._metrics = metrics or EngineMetrics()
+        self.evaluate_expression = self._evaluate_instrumented
+        self.validate_expression = self._timed('validate', CalculatorEngine.validate_expression)
+        self._sanitize_expression = self._timed('sanitize', CalculatorEngine._sanitize_expression)
+        self.evaluate_many = self._timed('evaluate_many', CalculatorEngine.evaluate_many)
+        return self._metrics
+    
+    def disable_metrics(self) -> None:
+        """Stop recording and restore the uninstrumented entry points."""
+        for name in ('evaluate_expression', 'validate_expression',
+                     '_sanitize_expression', 'evaluate_many'):
+            self.__dict__.pop(name, None)
+        self._metrics = None
+    
+    def _timed(self, phase: str, method: Callable) -> Callable:
+        """Wrap an unbound method so each call is recorded under phase."""
+        metrics = self._metrics
+        
+        def call(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                metrics.observe(phase, perf_counter_ns() - start)
+        
+        call.__doc__ = method.__doc__
+        return call
+    
+    def _evaluate_instrumented(self, expression: str) -> str:
+        """evaluate_expression, timing tokenize/evaluate/format and counting outcomes."""
+        metrics = self._metrics
+        start = perf_counter_ns()
+        rejected = "?"
+        try:
+            tokens = tokenize(expression, budget=self._budget) if expression and expression.strip() else None
+        except BudgetExceeded:
+            tokens, rejected = None, TOO_COMPLEX
+        except ValueError as e:
+            metrics.count_exception(e)
+            tokens = None
+        tokenized = perf_counter_ns()
+        metrics.observe('tokenize', tokenized - start)
+        
+        key = ''.join(tokens) if tokens and self.cache_size else None
+        result = self._cache_get(key) if key else None
+        if tokens is None:
+            result = rejected
+        elif result is not None:
+            metrics.cache_hits += 1
+        else:
+            try:
+                value = self._compute(tokens)
+                computed = perf_counter_ns()
+                metrics.observe('evaluate', computed - tokenized)
+                result = self._format_result(value)
+                metrics.observe('format', perf_counter_ns() - computed)
+            except BudgetExceeded:
+                result = TOO_COMPLEX
+            except Exception as e:
+                metrics.count_exception(e)
+                result = "?"
+            if key:
+                self._cache_put(key, result)
+        
+        metrics.count_result(result)
+        metrics.observe('total', perf_counter_ns() - start)
+        return result
+    
+    def session(self) -> 'EvaluationSession':
+        """Create an incremental evaluation session for live-edited input."""
+        return EvaluationSession(self)
+    
+    def calculation_graph(self) -> 'CalculationGraph':
+        """Create a graph of named calculations that can reference each other."""
+        return CalculationGraph(self)
+    
+    def evaluate_many(self, expressions: Iterable[str],
+                      share_subexpressions: bool = False) -> List[str]:
+        """Evaluate many expressions, returning formatted results in order.
+        
+        Each distinct expression is evaluated once. When NumPy is installed
+        and the float backend is active, expressions sharing a shape and
+        differing only in numeric literals are parsed once and computed
+        together as array operations; output is identical to calling
+        evaluate_expression on each one.
+        
+        With share_subexpressions, parenthesized groups repeated anywhere in
+        the batch are evaluated once instead (see batch_info).
+        """
+        expressions = list(expressions)
+        if share_subexpressions:
+            return self._evaluate_shared(expressions)
+        
+        results = {}  # raw expression -> formatted result
+        groups = {}   # literal shape -> [(raw expression, compact expression)]
+        vectorize = self._backend.name == FLOAT and len(expressions) >= VECTORIZE_MIN_GROUP
+        numpy = _load_numpy() if vectorize else None
+        max_length = self._budget.max_operand_digits  # Longer input may hold an oversized literal
+        
+        for expression in expressions:
+            if expression in results:
+                continue
+            results[expression] = None
+            if numpy is None:
+                continue
+            compact = expression.strip().replace(' ', '')
+            if compact and len(compact) <= max_length:
+                groups.setdefault(literal_shape(compact), []).append((expression, compact))
+        
+        for shape, members in groups.items():
+            # Leading zeros, long ints and stray dots keep scalar semantics
+            if has_shape_sensitive_literal('|'.join(compact for _, compact in members)):
+                members = [m for m in members if not has_shape_sensitive_literal(m[1])]
+            if len(members) >= VECTORIZE_MIN_GROUP:
+                for (raw, _), result in zip(members, self._evaluate_group(numpy, shape, members)):
+                    results[raw] = result
+        
+        # Everything not vectorized goes through the scalar path
+        for expression, result in results.items():
+            if result is None:
+                results[expression] = self.evaluate_expression(expression)
+        
+        return [results[expression] for expression in expressions]
+    
+    def _evaluate_shared(self, expressions: List[str]) -> List[str]:
+        """Evaluate a batch with common-subexpression elimination.
+        
+        One group memo spans the batch, so each distinct parenthesized group
+        is evaluated once and folded to a constant wherever it recurs. Equal
+        canonical expressions and equal values share one formatted result.
+        """
+        backend = self._backend
+        memo = {}       # Group token text -> (value or raised exception, cost)
+        by_key = {}     # Canonical expression -> formatted result
+        formatted = {}  # (type, value) -> formatted result
+        by_raw = {}     # Raw expression -> (formatted result, token count)
+        stats = dict.fromkeys(('expressions', 'distinct_expressions', 'groups_evaluated',
+                               'groups_reused', 'tokens_total', 'tokens_parsed',
+                               'results_formatted'), 0)
+        stats['expressions'] = len(expressions)
+        
+        with backend.activate():
+            for expression in expressions:
+                if expression in by_raw:
+                    stats['tokens_total'] += by_raw[expression][1]
+                    continue
+                try:
+                    tokens = tokenize(expression, budget=self._budget) if expression.strip() else []
+                except BudgetExceeded:
+                    by_raw[expression] = (TOO_COMPLEX, 0)
+                    continue
+                except ValueError:
+                    tokens = []
+                if not tokens:
+                    by_raw[expression] = ("?", 0)
+                    continue
+                
+                stats['tokens_total'] += len(tokens)
+                key = ''.join(tokens)
+                result = by_key.get(key)
+                if result is None:
+                    parser = MemoizingParser(tokens, memo, backend.parse_literal,
+                                             backend.operators, self._budget)
+                    try:
+                        value = evaluate_tree(parser.parse(), backend.operators)
+                        result = formatted.get((type(value), value))
+                        if result is None:
+                            result = self._format_result(value)
+                            formatted[type(value), value] = result
+                            stats['results_formatted'] += 1
+                    except BudgetExceeded:
+                        result = TOO_COMPLEX
+                    except Exception:
+                        result = "?"
+                    memo.update(parser.used)
+                    by_key[key] = result
+                    stats['distinct_expressions'] += 1
+                    stats['groups_evaluated'] += parser.groups_evaluated
+                    stats['groups_reused'] += parser.groups_reused
+                    stats['tokens_parsed'] += len(tokens) - parser.tokens_reused
+                by_raw[expression] = (result, len(tokens))
+        
+        total = stats['tokens_total']
+        stats['work_eliminated'] = 1 - stats['tokens_parsed'] / total if total else 0.0
+        self._batch_stats = stats
+        return [by_raw[expression][0] for expression in expressions]
+    
+    def batch_info(self) -> Dict[str, Union[int, float]]:
+        """Return redundant-work statistics for the last shared batch.
+        
+        tokens_total counts every token in the batch; tokens_parsed counts
+        those actually parsed once duplicate expressions and memoized
+        groups are skipped. work_eliminated is the fraction saved.
+        """
+        return dict(self._batch_stats)
+    
+    def _evaluate_group(self, numpy, shape: str,
+                        members: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """Evaluate expressions sharing one literal shape as NumPy columns.
+        
+        Rows whose float64 result may differ from scalar evaluation are
+        returned as None for the caller to evaluate one at a time.
+        """
+        try:
+            tokens = tokenize(shape)
+        except ValueError:
+            return ["?"] * len(members)
+        
+        # Budget verdicts depend only on the shape; leave any shape that could
+        # come near the limits (or recurse deeply) to the scalar path
+        budget = self._budget
+        nesting = sum(token in '(+-' for token in tokens)
+        operations = sum(token in '+-*/' for token in tokens)
+        if (len(tokens) > VECTORIZE_MAX_TOKENS or nesting > budget.max_depth
+                or operations > budget.max_operations):
+            return [None] * len(members)
+        
+        try:
+            tree = ExpressionParser(tokens).parse()
+        except ValueError:
+            # Literals are well-formed, so the shape itself is invalid
+            return ["?"] * len(members)
+        
+        # One C-level pass extracts every literal; each row has the same count
+        literals = LITERAL_PATTERN.findall('|'.join(compact for _, compact in members))
+        columns = numpy.array(literals).astype(numpy.float64).reshape(len(members), -1).T
+        invalid = numpy.zeros(len(members), dtype=bool)
+        
+        with numpy.errstate(all='ignore'):
+            values, is_int = evaluate_tree_columns(tree, iter(columns), invalid)
+        
+        if is_int:
+            # Flagged rows may hold values beyond int64; they are discarded
+            values = numpy.where(invalid, 0, values).astype(numpy.int64)
+        formatted = self._format_values(numpy, values)
+        return [None if skip else result for result, skip in zip(formatted, invalid.tolist())]
+    
+    def _format_result(self, result: Union[int, float, decimal.Decimal, Fraction]) -> str:
+        """Format a numeric result for display."""
+        magnitude = abs(result)
+        if magnitude < self.min_representable and result != 0:
+            return "Too Small"
+        
+        if magnitude >= self._scientific_threshold:
+            # Avoids quadratic decimal conversion of huge values
+            return format_scientific(result, self.max_decimal_places)
+        
+        if isinstance(result, float):
+            formatted = f"{result:.{self.max_decimal_places}f}".rstrip('0').rstrip('.')
+            if '.' not in formatted and magnitude < 1e15:
+                return str(int(result))
+            return formatted
+        
+        if isinstance(result, int):
+            return format_integer(result)
+        
+        # Decimal and Fraction results are rounded exactly
+        return format_exact(result, self.max_decimal_places)
+    
+    def _format_values(self, numpy, values) -> List[str]:
+        """Format an int64 or float64 array of results like _format_result.
+        
+        Every row is rendered by one %-format call and trimmed by C-level
+        map passes; masks computed with NumPy pick out the few rows needing
+        special output, which are then patched one at a time.
+        """
+        places = self.max_decimal_places
+        is_int = values.dtype.kind == 'i'
+        rows = values.tolist()
+        if not rows or places <= 0:
+            return [self._format_result(value) for value in rows]
+        
+        template = '%d\n' if is_int else f'%.{places}f\n'
+        lines = ((template * len(rows)) % tuple(rows)).split('\n')
+        lines.pop()
+        if not is_int:
+            zeros, points = repeat('0', len(lines)), repeat('.', len(lines))
+            lines = list(map(str.rstrip, map(str.rstrip, lines, zeros), points))
+        
+        with numpy.errstate(invalid='ignore'):
+            magnitude = numpy.abs(values)
+            too_small = (magnitude < self.min_representable) & (values != 0)
+            scientific = ~too_small & (magnitude >= self._scientific_threshold)
+            if is_int:
+                truncated = numpy.zeros(len(rows), dtype=bool)
+            else:
+                # Non-integral values (and zeros, which may print as -0) that
+                # could round to a whole number are shown truncated instead
+                nearest = numpy.round(values)
+                truncated = (~too_small & ~scientific & (magnitude < 1e15)
+                             & (numpy.abs(values - nearest) < 10.0 ** -places)
+                             & ((values != nearest) | (values == 0)))
+        
+        for index in numpy.flatnonzero(too_small).tolist():
+            lines[index] = "Too Small"
+        for index in numpy.flatnonzero(scientific).tolist():
+            lines[index] = format_scientific(rows[index], places)
+        for index in numpy.flatnonzero(truncated).tolist():
+            if '.' not in lines[index]:
+                lines[index] = str(int(rows[index]))
+        return lines
+    
+    def _format_array(self, values) -> List[str]:
+        """Format an array of raw results; non-finite values become '?'."""
+        numpy = _load_numpy()
+        flat = numpy.asarray(values, dtype=numpy.float64).ravel()
+        finite = numpy.isfinite(flat)
+        
+        formatted = self._format_values(numpy, flat)
+        if finite.all():
+            return formatted
+        return [result if ok else "?" for result, ok in zip(formatted, finite.tolist())]
+    
     def _sanitize_expression(self, expression: str) -> str:
         """Sanitize expression to prevent code injection while allowing math."""
         # Remove spaces
@@ -108,4 +628,401 @@ class CalculatorEngine:
             if not current_number or current_number[-1] in operators:
                 return current_input + '0.'
         
-        return current_input + new_char
\ No newline at end of file
+        return current_input + new_char
+
+
+class EvaluationSession:
+    """Incremental evaluator for input that changes a keystroke at a time.
+    
+    Values of parenthesized groups from the previous input are kept, so an
+    insert or delete only re-parses the groups enclosing the edit plus the
+    top-level operator chain.
+    """
+    
+    # Memo size beyond which entries from failed parses are discarded
+    MAX_MEMO_ENTRIES = 256
+    
+    def __init__(self, engine: CalculatorEngine):
+        """Initialize session bound to an engine's formatting settings."""
+        self.engine = engine
+        self._backend = engine._backend
+        self._budget = engine._budget
+        self._memo = {}  # Group token text -> (value or raised exception, cost)
+        self._parser = None  # Parser of the update in progress, for cancel()
+        self._cancelled = False
+    
+    def update(self, text: str) -> str:
+        """Evaluate the new input text, reusing unchanged groups."""
+        metrics = self.engine._metrics
+        if metrics is None:
+            return self._update(text)
+        
+        start = perf_counter_ns()
+        result = self._update(text)
+        metrics.observe('session_update', perf_counter_ns() - start)
+        metrics.count_result(result)
+        return result
+    
+    def _update(self, text: str) -> str:
+        """Evaluate text against the group memo."""
+        self._cancelled = False
+        if not text or not text.strip():
+            return "?"
+        try:
+            tokens = tokenize(text, budget=self.engine._budget)
+        except BudgetExceeded:
+            return TOO_COMPLEX
+        except ValueError:
+            return "?"
+        if self._cancelled:
+            return "?"
+        
+        backend, budget = self.engine._backend, self.engine._budget
+        if backend is not self._backend or budget is not self._budget:
+            # Memoized values and costs belong to the previous backend and budget
+            self._backend, self._budget, self._memo = backend, budget, {}
+        
+        parser = self._parser = MemoizingParser(tokens, self._memo, backend.parse_literal,
+                                                backend.operators, budget)
+        if self._cancelled:
+            parser.cancel()
+        try:
+            with backend.activate():
+                result = self.engine._format_result(evaluate_tree(parser.parse(), backend.operators))
+        except Exception as e:
+            # Keep groups parsed so far alongside the previous ones
+            self._memo.update(parser.used)
+            if len(self._memo) > self.MAX_MEMO_ENTRIES:
+                self._memo = parser.used
+            return TOO_COMPLEX if isinstance(e, BudgetExceeded) else "?"
+        finally:
+            self._parser = None
+        
+        self._memo = parser.used
+        return result
+    
+    def cancel(self) -> None:
+        """Abandon the update in progress, if any, at its next operation.
+        
+        Meant to be called from another thread than the one running update,
+        whose result for the cancelled text should then be discarded.
+        Groups finished before the cancel stay memoized.
+        """
+        self._cancelled = True
+        parser = self._parser
+        if parser is not None:
+            parser.cancel()
+    
+    def reset(self) -> None:
+        """Forget all memoized groups."""
+        self._memo = {}
+
+
+class CalculationGraph:
+    """Named calculations that can reference each other, like spreadsheet cells.
+    
+    An entry depends on the names in its expression. Changing an entry
+    re-evaluates only the entries downstream of it, in topological order,
+    and stops along any path whose value did not change. Values are kept
+    unformatted so chains of references stay exact on exact backends.
+    """
+    
+    def __init__(self, engine: CalculatorEngine):
+        """Initialize an empty graph bound to an engine's backend and budget."""
+        self.engine = engine
+        self._backend = engine._backend
+        self._budget = engine._budget
+        self._expressions = {}  # Name -> expression text
+        self._tokens = {}       # Name -> canonical tokens, or the tokenize error
+        self._values = {}       # Name -> raw value or raised exception
+        self._depends_on = {}   # Name -> names its expression references
+        self._dependents = {}   # Name -> entries referencing it (defined or not)
+        self.recomputed = 0     # Entries evaluated by the last change
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._expressions
+    
+    def __len__(self) -> int:
+        return len(self._expressions)
+    
+    def names(self) -> List[str]:
+        """Return entry names in definition order."""
+        return list(self._expressions)
+    
+    def expression(self, name: str) -> str:
+        """Return the expression text of an entry."""
+        return self._expressions[name]
+    
+    def dependencies(self, name: str) -> List[str]:
+        """Return the names an entry references, sorted."""
+        return sorted(self._depends_on[name])
+    
+    def dependents(self, name: str) -> List[str]:
+        """Return the entries depending on name, directly or not, in topological order."""
+        return [entry for entry in self._downstream([name]) if entry != name]
+    
+    def set(self, name: str, expression: str) -> str:
+        """Define or replace an entry and update everything downstream of it.
+        
+        Returns the entry's formatted result. References to names that are
+        not defined yet give '?' until they are.
+        
+        Raises:
+            ExpressionError: If name is not an identifier or the expression
+                would make the entry depend on itself
+        """
+        if not _NAME_PATTERN.fullmatch(name):
+            raise ExpressionError(f"Invalid name: {name!r}")
+        try:
+            tokens = tokenize(expression, allow_variables=True)
+            depends_on = {token for token in tokens if token[0] in NAME_START}
+        except ExpressionError as e:
+            tokens, depends_on = e, set()
+        if name in depends_on or self._reaches(depends_on, name):
+            raise ExpressionError(f"Circular reference through {name!r}")
+        
+        self._refresh()
+        for upstream in self._depends_on.get(name, ()):
+            self._dependents[upstream].discard(name)
+        for upstream in depends_on:
+            self._dependents.setdefault(upstream, set()).add(name)
+        self._expressions[name] = expression
+        self._tokens[name] = tokens
+        self._depends_on[name] = depends_on
+        
+        old = self._values.get(name, _MISSING)
+        self._values[name] = value = self._evaluate(name)
+        self.recomputed = 1
+        if old is _MISSING or not _same_value(old, value):
+            self._propagate({name})
+        return self.result(name)
+    
+    def remove(self, name: str) -> None:
+        """Delete an entry; entries referencing it show '?' until it is redefined."""
+        self._refresh()
+        for upstream in self._depends_on.pop(name):
+            self._dependents[upstream].discard(name)
+        del self._expressions[name], self._tokens[name], self._values[name]
+        self.recomputed = 0
+        self._propagate({name})
+    
+    def result(self, name: str) -> str:
+        """Return an entry's result formatted like evaluate_expression."""
+        self._refresh()
+        value = self._values[name]
+        if isinstance(value, BudgetExceeded):
+            return TOO_COMPLEX
+        if isinstance(value, Exception):
+            return "?"
+        try:
+            return self.engine._format_result(value)
+        except Exception:
+            return "?"
+    
+    def value(self, name: str) -> Union[int, float, decimal.Decimal, Fraction]:
+        """Return an entry's raw value, raising the error it evaluated to."""
+        self._refresh()
+        value = self._values[name]
+        if isinstance(value, Exception):
+            raise value
+        return value
+    
+    def evaluate(self, expression: str) -> str:
+        """Evaluate an expression against the entries without storing it."""
+        self._refresh()
+        try:
+            tokens = tokenize(expression, allow_variables=True, budget=self.engine._budget)
+        except BudgetExceeded:
+            return TOO_COMPLEX
+        except ExpressionError:
+            return "?"
+        if not tokens:
+            return "?"
+        value = self._evaluate_tokens(tokens, {token for token in tokens if token[0] in NAME_START})
+        if isinstance(value, BudgetExceeded):
+            return TOO_COMPLEX
+        if isinstance(value, Exception):
+            return "?"
+        try:
+            return self.engine._format_result(value)
+        except Exception:
+            return "?"
+    
+    def _refresh(self) -> None:
+        """Re-evaluate every entry if the engine's backend or budget changed."""
+        backend, budget = self.engine._backend, self.engine._budget
+        if backend is self._backend and budget is self._budget:
+            return
+        self._backend, self._budget = backend, budget
+        order = self._downstream(self._expressions)
+        for name in order:
+            self._values[name] = self._evaluate(name)
+        self.recomputed = len(order)
+    
+    def _evaluate(self, name: str):
+        """Evaluate one entry from the current values of its dependencies."""
+        tokens = self._tokens[name]
+        if isinstance(tokens, Exception):
+            return tokens
+        return self._evaluate_tokens(tokens, self._depends_on[name])
+    
+    def _evaluate_tokens(self, tokens: List[str], names: Iterable[str]):
+        """Compute tokens with names bound, returning the value or the error raised."""
+        variables = {}
+        for name in names:
+            value = self._values.get(name, _MISSING)
+            if value is _MISSING:
+                return ExpressionError(f"Unknown name: {name!r}")
+            if isinstance(value, Exception):
+                # Errors propagate downstream like spreadsheet error values
+                return value
+            variables[name] = value
+        try:
+            return self.engine._compute(tokens, variables)
+        except Exception as e:
+            return e
+    
+    def _propagate(self, changed: set) -> None:
+        """Re-evaluate entries downstream of changed names whose inputs changed."""
+        for name in self._downstream(changed):
+            if name in changed or not self._depends_on[name] & changed:
+                continue
+            value = self._evaluate(name)
+            self.recomputed += 1
+            if not _same_value(self._values[name], value):
+                changed.add(name)
+            self._values[name] = value
+    
+    def _downstream(self, names: Iterable[str]) -> List[str]:
+        """Return names and every entry depending on them, in topological order."""
+        # Iterative depth-first search; reversed post-order is topological
+        order = []
+        seen = set(names)
+        dependents = self._dependents
+        for root in seen.copy():
+            stack = [(root, iter(dependents.get(root, ())))]
+            while stack:
+                node, children = stack[-1]
+                for child in children:
+                    if child not in seen:
+                        seen.add(child)
+                        stack.append((child, iter(dependents.get(child, ()))))
+                        break
+                else:
+                    stack.pop()
+                    order.append(node)
+        order.reverse()
+        return order
+    
+    def _reaches(self, names: Iterable[str], target: str) -> bool:
+        """Check whether target is among names or anything they depend on."""
+        stack = list(names)
+        seen = set(stack)
+        while stack:
+            name = stack.pop()
+            if name == target:
+                return True
+            for upstream in self._depends_on.get(name, ()):
+                if upstream not in seen:
+                    seen.add(upstream)
+                    stack.append(upstream)
+        return False
+
+
+def _same_value(old, new) -> bool:
+    """Check whether a re-evaluated value leaves downstream entries unchanged."""
+    if isinstance(old, Exception) or isinstance(new, Exception):
+        return type(old) is type(new) and old.args == new.args
+    return type(old) is type(new) and old == new
+
+
+# Names usable for calculation graph entries
+_NAME_PATTERN = re.compile(r'[A-Za-z_][A-Za-z0-9_]*')
+
+# Marks graph entries without a value yet
+_MISSING = object()
+
+# Marks compiled subtrees whose value depends on a variable
+_VARIABLE_VALUE = object()
+
+
+class CompiledExpression:
+    """Reusable expression with named variables, callable on scalars or arrays."""
+    
+    def __init__(self, engine: CalculatorEngine, expression: str, tree: tuple):
+        """Initialize from a parsed expression tree."""
+        self.engine = engine
+        self.expression = expression
+        self.variables = []  # Names in order of first appearance
+        self._function, _ = self._build(tree)
+    
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.expression!r}, variables={self.variables})"
+    
+    def __call__(self, *args, **kwargs):
+        """Evaluate with variable values given positionally or by name.
+        
+        Scalars give a raw Python number (division by zero raises). NumPy
+        arrays broadcast element-wise and give an array, with division by
+        zero producing inf/nan instead of raising.
+        """
+        if len(args) > len(self.variables):
+            raise TypeError(f"Expected at most {len(self.variables)} positional values")
+        env = dict(zip(self.variables, args))
+        env.update(kwargs)
+        missing = [name for name in self.variables if name not in env]
+        if missing:
+            raise TypeError(f"Missing values for variables: {', '.join(missing)}")
+        
+        numpy = _load_numpy()
+        if numpy is not None and any(isinstance(value, numpy.ndarray) for value in env.values()):
+            with numpy.errstate(divide='ignore', invalid='ignore', over='ignore'):
+                return self._function(env)
+        return self._function(env)
+    
+    def format(self, values) -> Union[str, List[str]]:
+        """Format raw results like evaluate_expression (arrays give a list)."""
+        numpy = _load_numpy()
+        if numpy is not None and isinstance(values, numpy.ndarray):
+            return self.engine._format_array(values)
+        try:
+            return self.engine._format_result(values)
+        except (TypeError, ValueError, OverflowError):
+            return "?"
+    
+    def _build(self, node: tuple) -> Tuple[Callable, object]:
+        """Turn a tree into nested closures, folding constant subtrees.
+        
+        Returns the closure and the folded value, or _VARIABLE_VALUE when
+        the subtree depends on a variable.
+        """
+        kind = node[0]
+        
+        if kind == NUMBER:
+            value = node[1]
+            return (lambda env: value), value
+        if kind == VARIABLE:
+            name = node[1]
+            if name not in self.variables:
+                self.variables.append(name)
+            return (lambda env: env[name]), _VARIABLE_VALUE
+        
+        if kind in (NEGATE, POSITIVE):
+            op = operator.neg if kind == NEGATE else operator.pos
+            operand, operand_value = self._build(node[1])
+            function = lambda env: op(operand(env))
+            operands = (operand_value,)
+        else:
+            op = BINARY_OPERATORS[kind]
+            (left, left_value), (right, right_value) = self._build(node[1]), self._build(node[2])
+            function = lambda env: op(left(env), right(env))
+            operands = (left_value, right_value)
+        
+        if any(value is _VARIABLE_VALUE for value in operands):
+            return function, _VARIABLE_VALUE
+        try:
+            value = op(*operands)
+        except ArithmeticError:
+            # Leave e.g. 1/0 to raise (or produce inf/nan) at call time
+            return function, _VARIABLE_VALUE
+        return (lambda env: value), value
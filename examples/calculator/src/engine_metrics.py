@@ -0,0 +1,140 @@
+"""
+Engine Metrics
+Opt-in latency histograms and outcome counters for the calculator engine.
+"""
+
+from typing import Dict, List
+
+
+# Histogram buckets are powers of two in nanoseconds: bucket i holds
+# samples below 2**i ns, except the last, which catches everything from ~8.6 s
+HISTOGRAM_BUCKETS = 35
+
+# Outcome labels for formatted results; anything else counts as 'ok'
+RESULT_OUTCOMES = {"?": 'invalid', "Too Small": 'too_small', "Too Complex": 'too_complex'}
+
+
+class LatencyHistogram:
+    """Fixed log2-bucketed histogram of durations in nanoseconds."""
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total_ns = 0
+
+    def observe(self, elapsed_ns: int) -> None:
+        """Record one duration."""
+        self.counts[min(elapsed_ns.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ns += elapsed_ns
+
+    def quantile(self, q: float) -> float:
+        """Return an upper bound in seconds for quantile q (0 if empty)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts[:-1]):
+            seen += count
+            if seen >= rank:
+                return 2 ** index / 1e9
+        # The open-ended last bucket has no finite bound
+        return float('inf')
+
+    def to_dict(self) -> Dict[str, float]:
+        """Summarize as count, mean and p50/p99/max upper bounds in seconds."""
+        return {
+            'count': self.count,
+            'mean': self.total_ns / self.count / 1e9 if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'max': self.quantile(1.0),
+        }
+
+
+class EngineMetrics:
+    """Per-phase latency histograms plus result and exception counters.
+
+    Updates are plain attribute arithmetic without locking; one instance is
+    meant to be shared by code running on a single thread or event loop.
+    """
+
+    def __init__(self):
+        """Initialize with no recorded phases or outcomes."""
+        self.phases = {}      # Phase name -> LatencyHistogram
+        self.results = dict.fromkeys(list(RESULT_OUTCOMES.values()) + ['ok'], 0)
+        self.exceptions = {}  # Exception class name -> count
+        self.cache_hits = 0
+
+    def observe(self, phase: str, elapsed_ns: int) -> None:
+        """Record one duration for phase."""
+        histogram = self.phases.get(phase)
+        if histogram is None:
+            histogram = self.phases[phase] = LatencyHistogram()
+        histogram.observe(elapsed_ns)
+
+    def count_result(self, result: str) -> None:
+        """Count a formatted result by outcome."""
+        self.results[RESULT_OUTCOMES.get(result, 'ok')] += 1
+
+    def count_exception(self, error: BaseException) -> None:
+        """Count an exception swallowed while evaluating."""
+        name = type(error).__name__
+        self.exceptions[name] = self.exceptions.get(name, 0) + 1
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        self.__init__()
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Export phase summaries and counters as plain dicts."""
+        return {
+            'phases': {phase: histogram.to_dict() for phase, histogram in self.phases.items()},
+            'results': dict(self.results),
+            'exceptions': dict(self.exceptions),
+            'cache_hits': self.cache_hits,
+        }
+
+    def to_prometheus(self, prefix: str = 'calculator') -> str:
+        """Export in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {prefix}_phase_seconds Time spent in each evaluation phase.",
+            f"# TYPE {prefix}_phase_seconds histogram",
+        ]
+        for phase, histogram in self.phases.items():
+            lines.extend(_histogram_lines(f"{prefix}_phase_seconds", f'phase="{phase}"', histogram))
+
+        lines += [
+            f"# HELP {prefix}_results_total Formatted results by outcome.",
+            f"# TYPE {prefix}_results_total counter",
+        ]
+        lines += [f'{prefix}_results_total{{outcome="{outcome}"}} {count}'
+                  for outcome, count in self.results.items()]
+
+        lines += [
+            f"# HELP {prefix}_exceptions_total Exceptions turned into '?' results.",
+            f"# TYPE {prefix}_exceptions_total counter",
+        ]
+        lines += [f'{prefix}_exceptions_total{{type="{name}"}} {count}'
+                  for name, count in sorted(self.exceptions.items())]
+
+        lines += [
+            f"# HELP {prefix}_cache_hits_total Results served from the result cache.",
+            f"# TYPE {prefix}_cache_hits_total counter",
+            f"{prefix}_cache_hits_total {self.cache_hits}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(name: str, labels: str, histogram: LatencyHistogram) -> List[str]:
+    """Render one histogram's cumulative buckets, sum and count."""
+    lines = []
+    cumulative = 0
+    for index, count in enumerate(histogram.counts[:-1]):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{2 ** index / 1e9:.9g}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram.total_ns / 1e9:.9g}')
+    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    return lines
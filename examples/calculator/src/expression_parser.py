@@ -0,0 +1,510 @@
+"""
+Expression Parser
+Single-pass lexer and precedence-climbing parser for calculator expressions.
+"""
+
+import math
+import operator
+import re
+from fractions import Fraction
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+
+Number = Union[int, float]
+Node = Tuple
+
+# AST node kinds (binary nodes use the operator symbol itself)
+NUMBER = 'num'
+VARIABLE = 'var'
+NEGATE = 'neg'
+POSITIVE = 'pos'
+
+BINARY_OPERATORS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.truediv,
+}
+
+# Binding power of binary operators; unary signs bind tighter than both
+PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2}
+
+# Display operators accepted as aliases for their Python equivalents
+DISPLAY_OPERATORS = {'×': '*', '÷': '/'}
+
+_TOKEN_PATTERN = re.compile(r'[0-9.]+|[A-Za-z_][A-Za-z0-9_]*|.', re.DOTALL)
+_DIGITS = '0123456789'
+_NUMBER_START = '0123456789.'
+NAME_START = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_')
+
+
+# Default evaluation budget; worst-case work per expression is roughly
+# max_operations arithmetic steps on operands of max_operand_digits digits
+DEFAULT_MAX_DEPTH = 100
+DEFAULT_MAX_OPERAND_DIGITS = 1000
+DEFAULT_MAX_OPERATIONS = 1000
+
+
+class ExpressionError(ValueError):
+    """Raised when an expression cannot be tokenized or parsed."""
+
+
+class BudgetExceeded(ExpressionError):
+    """Raised when an expression exceeds its evaluation budget."""
+
+
+class EvaluationBudget:
+    """Limits bounding the cost of parsing and evaluating one expression."""
+
+    def __init__(self, max_depth: int = DEFAULT_MAX_DEPTH,
+                 max_operand_digits: int = DEFAULT_MAX_OPERAND_DIGITS,
+                 max_operations: int = DEFAULT_MAX_OPERATIONS):
+        """Initialize budget.
+
+        Args:
+            max_depth: Deepest nesting of parentheses and unary signs
+            max_operand_digits: Longest literal and largest exact result, in digits
+            max_operations: Most unary and binary operations performed
+        """
+        self.max_depth = max_depth
+        self.max_operand_digits = max_operand_digits
+        self.max_operations = max_operations
+        # Integers up to this many bits have at most max_operand_digits digits
+        self.max_bits = int(max_operand_digits * math.log2(10))
+        # Longer input cannot stay within the budget, so it is rejected unread
+        self.max_length = (max_operations + 1) * (max_operand_digits + 2)
+
+    def __repr__(self) -> str:
+        return (f"EvaluationBudget(max_depth={self.max_depth}, "
+                f"max_operand_digits={self.max_operand_digits}, "
+                f"max_operations={self.max_operations})")
+
+
+def tokenize(expression: str, allow_variables: bool = False,
+             budget: Optional[EvaluationBudget] = None) -> List[str]:
+    """Split expression into canonical tokens in a single pass.
+
+    Spaces are ignored entirely (so digits separated by spaces form one
+    literal), display operators are mapped and implicit multiplication
+    such as 2(3), (2)3 and (2)(3) is made explicit. With allow_variables,
+    identifiers are accepted and multiply implicitly like parenthesized
+    groups, e.g. 2a(b) becomes 2*a*(b).
+
+    With a budget, input longer than its max_length raises BudgetExceeded
+    before any of it is read, keeping the cost of rejecting oversized
+    input independent of its length.
+    """
+    if budget is not None and len(expression) > budget.max_length:
+        raise BudgetExceeded("Expression too long")
+    tokens = []
+    prev = ''
+    dash_run = 0
+
+    for text in _TOKEN_PATTERN.findall(expression.strip().replace(' ', '')):
+        first = text[0]
+
+        if first in _NUMBER_START:
+            if first != '.' and (prev == ')' or (prev and prev[0] in NAME_START)):
+                tokens.append('*')
+        elif first in '+-*/×÷':
+            text = DISPLAY_OPERATORS.get(text, text)
+            if text == '-':
+                dash_run = dash_run + 1 if prev == '-' else 1
+                if dash_run > 2:
+                    raise ExpressionError("Invalid operator sequence")
+            elif prev and prev in '+*/':
+                raise ExpressionError("Invalid operator sequence")
+        elif first == '(':
+            if prev == ')' or (prev and (prev[-1] in _DIGITS or prev[0] in NAME_START)):
+                tokens.append('*')
+        elif first in NAME_START and allow_variables:
+            if prev == ')' or (prev and prev[-1] in _DIGITS):
+                tokens.append('*')
+        elif first != ')':
+            raise ExpressionError(f"Invalid character: {text!r}")
+
+        tokens.append(text)
+        prev = text
+
+    return tokens
+
+
+def parse_number(text: str) -> Number:
+    """Convert a numeric literal using Python literal rules."""
+    if '.' in text:
+        return float(text)  # Rejects '.', '1.2.3' and similar
+    if text[0] == '0' and text.strip('0'):
+        raise ExpressionError("Leading zeros in integer literal")
+    return int(text)
+
+
+class ExpressionParser:
+    """Precedence-climbing parser producing a compact tuple AST."""
+
+    def __init__(self, tokens: List[str], parse_literal: Callable = parse_number):
+        """Initialize parser over a token list.
+
+        Args:
+            tokens: Canonical tokens from tokenize
+            parse_literal: Converts numeric literal text into a number
+        """
+        self.tokens = tokens
+        self.parse_literal = parse_literal
+        self.pos = 0
+
+    def parse(self) -> Node:
+        """Parse the whole token list into a single expression tree."""
+        node = self._parse_binary(1)
+        if self.pos != len(self.tokens):
+            raise ExpressionError(f"Unexpected token: {self.tokens[self.pos]!r}")
+        return node
+
+    def _parse_binary(self, min_precedence: int) -> Node:
+        """Parse operators binding at least as tightly as min_precedence."""
+        left = self._parse_unary()
+        tokens = self.tokens
+
+        while self.pos < len(tokens):
+            op = tokens[self.pos]
+            precedence = PRECEDENCE.get(op)
+            if precedence is None or precedence < min_precedence:
+                break
+            self.pos += 1
+            right = self._parse_binary(precedence + 1)
+            left = self._binary_node(op, left, right)
+
+        return left
+
+    def _parse_unary(self) -> Node:
+        """Parse a signed operand, parenthesized group or number."""
+        if self.pos >= len(self.tokens):
+            raise ExpressionError("Unexpected end of expression")
+
+        token = self.tokens[self.pos]
+        self.pos += 1
+
+        if token == '-':
+            return self._unary_node(NEGATE, self._parse_unary())
+        if token == '+':
+            return self._unary_node(POSITIVE, self._parse_unary())
+        if token == '(':
+            return self._parse_group()
+        if token[0] in _NUMBER_START:
+            return (NUMBER, self.parse_literal(token))
+        if token[0] in NAME_START:
+            return (VARIABLE, token)
+
+        raise ExpressionError(f"Unexpected token: {token!r}")
+
+    def _parse_group(self) -> Node:
+        """Parse the inside of a parenthesized group and its closing ')'."""
+        node = self._parse_binary(1)
+        if self.pos >= len(self.tokens) or self.tokens[self.pos] != ')':
+            raise ExpressionError("Unbalanced parentheses")
+        self.pos += 1
+        return node
+
+    def _binary_node(self, op: str, left: Node, right: Node) -> Node:
+        """Build the node for a binary operation."""
+        return (op, left, right)
+
+    def _unary_node(self, kind: str, operand: Node) -> Node:
+        """Build the node for a sign applied to an operand."""
+        return (kind, operand)
+
+
+class FoldingParser(ExpressionParser):
+    """Parser that evaluates constant operations as it parses, within a budget.
+
+    The tree returned by parse() is a single NUMBER node for any constant
+    expression, so no separate (recursive) evaluation pass is needed. Depth,
+    literal length, exact result size and operation count are checked as
+    parsing proceeds, raising BudgetExceeded as soon as one is exceeded.
+    Names found in variables are substituted as constants while parsing.
+    """
+
+    def __init__(self, tokens: List[str], parse_literal: Callable = parse_number,
+                 operators: dict = BINARY_OPERATORS, budget: Optional[EvaluationBudget] = None,
+                 variables: Optional[dict] = None):
+        """Initialize parser; budget defaults to EvaluationBudget()."""
+        super().__init__(tokens, parse_literal)
+        self.operators = operators
+        self.budget = budget or _DEFAULT_BUDGET
+        self.variables = variables
+        self.depth = 0     # Open parentheses and unary signs around the current operand
+        self.deepest = 0
+        self.operations = 0
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        """Stop at the next literal or operation by raising BudgetExceeded.
+
+        Safe to call from another thread. Swapping in an exhausted budget
+        means parses that are never cancelled pay nothing extra for it.
+        """
+        self.cancelled = True
+        self.budget = _CANCELLED_BUDGET
+
+    def _parse_unary(self) -> Node:
+        """Parse a signed operand, parenthesized group or number within the depth budget."""
+        if self.pos >= len(self.tokens):
+            raise ExpressionError("Unexpected end of expression")
+
+        token = self.tokens[self.pos]
+        self.pos += 1
+
+        if token[0] in _NUMBER_START:
+            if len(token) > self.budget.max_operand_digits:
+                raise BudgetExceeded("Literal too long")
+            return (NUMBER, self.parse_literal(token))
+        if token in _NESTING_TOKENS:
+            self.depth += 1
+            if self.depth > self.deepest:
+                if self.depth > self.budget.max_depth:
+                    raise BudgetExceeded("Expression nested too deeply")
+                self.deepest = self.depth
+            if token == '(':
+                node = self._parse_group()
+            else:
+                node = self._unary_node(NEGATE if token == '-' else POSITIVE, self._parse_unary())
+            self.depth -= 1
+            return node
+        if token[0] in NAME_START:
+            if self.variables is None:
+                return (VARIABLE, token)
+            value = self.variables.get(token, _MISSING)
+            if value is _MISSING:
+                raise ExpressionError(f"Unknown name: {token!r}")
+            return (NUMBER, value)
+
+        raise ExpressionError(f"Unexpected token: {token!r}")
+
+    def _binary_node(self, op: str, left: Node, right: Node) -> Node:
+        """Fold an operation on two constants into a NUMBER node."""
+        self.operations += 1
+        if self.operations > self.budget.max_operations:
+            raise BudgetExceeded("Too many operations")
+        if left[0] != NUMBER or right[0] != NUMBER:
+            return (op, left, right)
+
+        value = self.operators[op](left[1], right[1])
+        if type(value) is int:
+            if value.bit_length() > self.budget.max_bits:
+                raise BudgetExceeded("Result too large")
+        elif type(value) is Fraction:
+            self._check_fraction(value)
+        return (NUMBER, value)
+
+    def _unary_node(self, kind: str, operand: Node) -> Node:
+        """Fold a sign applied to a constant into a NUMBER node."""
+        self.operations += 1
+        if self.operations > self.budget.max_operations:
+            raise BudgetExceeded("Too many operations")
+        if operand[0] == NUMBER:
+            return (NUMBER, -operand[1] if kind == NEGATE else +operand[1])
+        return (kind, operand)
+
+    def _check_fraction(self, value: Fraction) -> None:
+        """Reject fractions whose terms have more digits than the budget allows."""
+        max_bits = self.budget.max_bits
+        if value.numerator.bit_length() > max_bits or value.denominator.bit_length() > max_bits:
+            raise BudgetExceeded("Result too large")
+
+
+class BudgetedParser(FoldingParser):
+    """Parser checking a budget like FoldingParser but building the plain tree.
+
+    For callers that evaluate the tree themselves with their own semantics,
+    such as compiled expressions over floats and arrays.
+    """
+
+    def _binary_node(self, op: str, left: Node, right: Node) -> Node:
+        """Count a binary operation against the budget."""
+        self.operations += 1
+        if self.operations > self.budget.max_operations:
+            raise BudgetExceeded("Too many operations")
+        return (op, left, right)
+
+    def _unary_node(self, kind: str, operand: Node) -> Node:
+        """Count a sign against the budget."""
+        self.operations += 1
+        if self.operations > self.budget.max_operations:
+            raise BudgetExceeded("Too many operations")
+        return (kind, operand)
+
+
+class MemoizingParser(FoldingParser):
+    """Folding parser that reuses parenthesized group values through a memo.
+
+    Groups are keyed by their canonical token text, so a group seen in an
+    earlier parse sharing the memo is neither re-parsed nor re-evaluated.
+    Entries touched by this parse are collected in used, letting callers
+    keep just the groups of the latest input. Each entry records the
+    operations and nesting its group cost, which are charged again on
+    reuse so budgets give the same verdict as a fresh parse.
+    """
+
+    def __init__(self, tokens: List[str], memo: dict, parse_literal: Callable = parse_number,
+                 operators: dict = BINARY_OPERATORS, budget: Optional[EvaluationBudget] = None):
+        """Initialize parser with a memo of group text -> (value or error, cost)."""
+        super().__init__(tokens, parse_literal, operators, budget)
+        self.memo = memo
+        self.used = {}
+        self.closing = {}  # Index of '(' -> index of its matching ')'
+        self.groups_evaluated = 0
+        self.groups_reused = 0
+        self.tokens_reused = 0  # Tokens skipped thanks to memoized groups
+
+        stack = []
+        for index, token in enumerate(tokens):
+            if token == '(':
+                stack.append(index)
+            elif token == ')' and stack:
+                self.closing[stack.pop()] = index
+
+    def _parse_group(self) -> Node:
+        """Return a memoized group as a folded NUMBER node."""
+        start = self.pos
+        end = self.closing.get(start - 1)
+        if end is None:
+            return super()._parse_group()
+
+        key = ''.join(self.tokens[start:end])
+        entry = self.used.get(key, _MISSING)
+        if entry is _MISSING:
+            entry = self.memo.get(key, _MISSING)
+        if entry is _MISSING:
+            self.groups_evaluated += 1
+            entry = self._evaluate_group()
+        else:
+            self.groups_reused += 1
+            self.tokens_reused += end + 1 - start
+            self._charge(entry)
+        self.used[key] = entry
+        self.pos = end + 1
+
+        value = entry[0]
+        if isinstance(value, Exception):
+            raise value.with_traceback(None)
+        return (NUMBER, value)
+
+    def _evaluate_group(self) -> Tuple[object, int, int]:
+        """Parse a group; return its value or error, operations and nesting."""
+        depth, deepest, operations = self.depth, self.deepest, self.operations
+        self.deepest = depth
+        try:
+            value = evaluate_tree(super()._parse_group(), self.operators)
+        except BudgetExceeded:
+            # Depends on the enclosing expression, so never memoized
+            raise
+        except (ArithmeticError, ValueError) as e:
+            value = e
+        self.depth = depth
+        entry = (value, self.operations - operations, self.deepest - depth)
+        self.deepest = max(deepest, self.deepest)
+        return entry
+
+    def _charge(self, entry: Tuple[object, int, int]) -> None:
+        """Charge a reused group's recorded cost against the budget."""
+        _, operations, nesting = entry
+        self.operations += operations
+        if self.operations > self.budget.max_operations:
+            raise BudgetExceeded("Too many operations")
+        if self.depth + nesting > self.deepest:
+            if self.depth + nesting > self.budget.max_depth:
+                raise BudgetExceeded("Expression nested too deeply")
+            self.deepest = self.depth + nesting
+
+
+_NESTING_TOKENS = frozenset('-+(')
+_MISSING = object()
+_DEFAULT_BUDGET = EvaluationBudget()
+_CANCELLED_BUDGET = EvaluationBudget(max_depth=-1, max_operand_digits=-1, max_operations=-1)
+
+
+def parse_expression(expression: str) -> Node:
+    """Tokenize and parse an expression string."""
+    return ExpressionParser(tokenize(expression)).parse()
+
+
+def evaluate_tree(node: Node, operators: dict = BINARY_OPERATORS) -> Number:
+    """Evaluate a constant expression tree.
+
+    Python number semantics apply unless operators overrides the binary
+    operator functions (used by the exact numeric backends).
+    """
+    kind = node[0]
+
+    if kind == NUMBER:
+        return node[1]
+    if kind == VARIABLE:
+        raise ExpressionError(f"Unbound variable: {node[1]!r}")
+    if kind == NEGATE:
+        return -evaluate_tree(node[1], operators)
+    if kind == POSITIVE:
+        return +evaluate_tree(node[1], operators)
+
+    return operators[kind](evaluate_tree(node[1], operators), evaluate_tree(node[2], operators))
+
+
+# Integers strictly below this magnitude are exact in IEEE doubles
+EXACT_INTEGER_LIMIT = 2.0 ** 53
+
+LITERAL_PATTERN = re.compile(r'[0-9.]+')
+_DIGIT_RUN = re.compile(r'[0-9]+')
+
+# Literals whose value or validity depends on more than their shape
+_SHAPE_SENSITIVE_LITERAL = re.compile(
+    r'(?<![0-9.])(?:0+[1-9][0-9]*|[0-9]{16,})(?![0-9.])'  # Leading zeros, inexact ints
+    r'|\.[0-9]*\.'                                        # Several decimal points
+    r'|(?<![0-9])\.(?![0-9])'                              # Lone decimal point
+)
+
+
+def literal_shape(compact: str) -> str:
+    """Return the literal-independent shape of a space-free expression.
+
+    Every digit run is collapsed to '0', so expressions that differ only in
+    numeric literals (but not in int/float kind) share a shape.
+    """
+    return _DIGIT_RUN.sub('0', compact)
+
+
+def has_shape_sensitive_literal(text: str) -> bool:
+    """Check for literals whose value or validity depends on more than shape."""
+    return _SHAPE_SENSITIVE_LITERAL.search(text) is not None
+
+
+def evaluate_tree_columns(node: Node, columns: Iterator, invalid) -> Tuple[object, bool]:
+    """Evaluate a tree over NumPy columns, one column per numeric literal.
+
+    Literal columns are consumed left to right in token order. Rows whose
+    float64 result could differ from scalar evaluation (division by zero or
+    integer results leaving the exactly representable range) are flagged
+    in the boolean array invalid. Returns the values and whether the node
+    is integer-typed under Python semantics.
+    """
+    kind = node[0]
+
+    if kind == NUMBER:
+        return next(columns), isinstance(node[1], int)
+    if kind == NEGATE:
+        values, is_int = evaluate_tree_columns(node[1], columns, invalid)
+        # Integer zero has no sign in Python; keep float64 zeros unsigned
+        return (-values + 0.0 if is_int else -values), is_int
+    if kind == POSITIVE:
+        return evaluate_tree_columns(node[1], columns, invalid)
+
+    left, left_int = evaluate_tree_columns(node[1], columns, invalid)
+    right, right_int = evaluate_tree_columns(node[2], columns, invalid)
+
+    if kind == '/':
+        invalid |= right == 0
+        return left / right, False
+
+    values = BINARY_OPERATORS[kind](left, right)
+    is_int = left_int and right_int
+    if is_int:
+        invalid |= ~(abs(values) < EXACT_INTEGER_LIMIT)
+        values = values + 0.0
+    return values, is_int
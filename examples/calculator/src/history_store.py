@@ -0,0 +1,217 @@
+"""
+History Store
+Persistent calculation history in SQLite (WAL mode) with a retention
+window and indexed prefix and substring search over expression text.
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+# Saves kept before the oldest entries are dropped
+DEFAULT_RETENTION = 100000
+
+# Database used when no path is given; CALCULATOR_HISTORY overrides it
+DEFAULT_PATH = Path.home() / ".calculator" / "history.db"
+
+# Matches returned by a search unless a limit is given
+DEFAULT_SEARCH_LIMIT = 100
+
+# Shortest substring the trigram index can look up
+_TRIGRAM = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,  -- Save order; saving an entry again moves it last
+    name TEXT UNIQUE,
+    expression TEXT NOT NULL,
+    result TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_expression ON history (expression);
+"""
+
+# Substring index over expressions, kept in sync by triggers
+_TEXT_INDEX_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS history_text USING fts5(
+    expression, content='history', content_rowid='seq', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS history_text_insert AFTER INSERT ON history BEGIN
+    INSERT INTO history_text (rowid, expression) VALUES (new.seq, new.expression);
+END;
+CREATE TRIGGER IF NOT EXISTS history_text_delete AFTER DELETE ON history BEGIN
+    INSERT INTO history_text (history_text, rowid, expression)
+    VALUES ('delete', old.seq, old.expression);
+END;
+"""
+
+_COLUMNS = "seq, name, expression, result"
+
+# Beyond any seq SQLite assigns
+_NO_SEQ = 2 ** 63 - 1
+
+
+def fuzzy_match(text: str, expression: str) -> bool:
+    """Check whether expression contains the characters of text in order, ignoring case."""
+    remaining = iter(expression.lower())
+    return all(char in remaining for char in text.lower())
+
+
+def _row_to_item(cursor: sqlite3.Cursor, row: tuple) -> Dict:
+    """Row factory producing history item dicts."""
+    return {'seq': row[0], 'name': row[1], 'expression': row[2], 'result': row[3]}
+
+
+class HistoryStore:
+    """Append-mostly calculation history persisted in SQLite.
+
+    Appends are a single indexed insert (plus at most a few deletes once
+    the retention window is full), so their cost does not depend on the
+    history size. Nothing is read at open time; callers page through
+    recent entries or search as needed.
+    """
+
+    def __init__(self, path: Optional[str] = None, retention: int = DEFAULT_RETENTION):
+        """Open (or create) a history database.
+
+        Args:
+            path: Database file, ':memory:' for a throwaway store, or None
+                for CALCULATOR_HISTORY / DEFAULT_PATH
+            retention: Entries kept, counting saves; older ones are dropped
+        """
+        if path is None:
+            path = os.environ.get('CALCULATOR_HISTORY') or DEFAULT_PATH
+        if path != ':memory:':
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        self.path = str(path)
+        self.retention = retention
+        self._count = None  # Computed on first use, then maintained
+
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # WAL keeps this crash-safe
+        self._conn.executescript(_SCHEMA)
+        try:
+            self._conn.executescript(_TEXT_INDEX_SCHEMA)
+            self.substring_index = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5 trigram support; substring search scans
+            self.substring_index = False
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = self._conn.execute("SELECT count(*) FROM history").fetchone()[0]
+        return self._count
+
+    def close(self) -> None:
+        """Close the database."""
+        self._conn.close()
+
+    def next_name(self) -> str:
+        """Return the name the next appended entry gets by default."""
+        row = self._conn.execute(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'history'").fetchone()
+        return f"r{(row[0] if row else 0) + 1}"
+
+    def append(self, expression: str, result: str, name: Optional[str] = None) -> str:
+        """Save a calculation as the most recent entry and return its name.
+
+        Saving under an existing name replaces that entry. Unnamed entries
+        are named after their position in save order (r1, r2, ...).
+        """
+        with self._conn:
+            if name is not None:
+                removed = self._conn.execute("DELETE FROM history WHERE name = ?", (name,)).rowcount
+                self._adjust_count(-removed)
+            seq = self._conn.execute(
+                "INSERT INTO history (name, expression, result) VALUES (?, ?, ?)",
+                (name, expression, result)).lastrowid
+            if name is None:
+                name = f"r{seq}"
+                self._conn.execute("UPDATE history SET name = ? WHERE seq = ?", (name, seq))
+            self._adjust_count(1)
+
+            # Drop entries that fell out of the retention window
+            dropped = self._conn.execute(
+                "DELETE FROM history WHERE seq <= ?", (seq - self.retention,)).rowcount
+            self._adjust_count(-dropped)
+        return name
+
+    def update_result(self, name: str, result: str) -> None:
+        """Store a recomputed result without moving the entry."""
+        with self._conn:
+            self._conn.execute("UPDATE history SET result = ? WHERE name = ?", (result, name))
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Return the entry saved under name, if it is still kept."""
+        items = self._items(f"SELECT {_COLUMNS} FROM history WHERE name = ?", (name,))
+        return items[0] if items else None
+
+    def recent(self, limit: int, before: Optional[int] = None) -> List[Dict]:
+        """Return up to limit entries, most recent first.
+
+        Pass the seq of the last entry of one page as before to get the next
+        page; unlike an offset, this costs the same however deep the page is.
+        """
+        if before is None:
+            return self._items(f"SELECT {_COLUMNS} FROM history ORDER BY seq DESC LIMIT ?", (limit,))
+        return self._items(f"SELECT {_COLUMNS} FROM history WHERE seq < ? ORDER BY seq DESC LIMIT ?",
+                           (before, limit))
+
+    def search(self, text: str, limit: int = DEFAULT_SEARCH_LIMIT,
+               prefix: bool = False) -> List[Dict]:
+        """Return up to limit entries whose expression contains text, most recent first.
+
+        With prefix, only expressions starting with text match (case-sensitive,
+        through the expression index). Substring matches are case-insensitive
+        and use the trigram index for text of three or more characters.
+        """
+        if prefix:
+            # Range scan on the index: text <= expression < text + highest code point
+            return self._items(
+                f"SELECT {_COLUMNS} FROM history WHERE expression >= ? AND expression < ? "
+                f"ORDER BY seq DESC LIMIT ?", (text, text + '\U0010ffff', limit))
+        if self.substring_index and len(text) >= _TRIGRAM:
+            phrase = '"' + text.replace('"', '""') + '"'
+            return self._items(
+                f"SELECT {_COLUMNS} FROM history WHERE seq IN "
+                f"(SELECT rowid FROM history_text WHERE history_text MATCH ?) "
+                f"ORDER BY seq DESC LIMIT ?", (phrase, limit))
+        # Too short for trigrams: newest-first scan that stops at limit matches
+        return self._items(
+            f"SELECT {_COLUMNS} FROM history WHERE instr(lower(expression), lower(?)) "
+            f"ORDER BY seq DESC LIMIT ?", (text, limit))
+
+    def fuzzy_search(self, text: str, limit: int = DEFAULT_SEARCH_LIMIT,
+                     before: Optional[int] = None) -> List[Dict]:
+        """Return up to limit entries fuzzy-matching text, most recent first.
+
+        An expression matches when it contains the characters of text in
+        order, ignoring case (see fuzzy_match). The newest-first scan stops
+        at limit matches; pass the seq of the last match as before to
+        continue it.
+        """
+        # Each character may be preceded by anything; LIKE wildcards are escaped
+        pattern = '%' + '%'.join('\\' + char if char in '%_\\' else char for char in text) + '%'
+        return self._items(
+            f"SELECT {_COLUMNS} FROM history WHERE seq < ? AND expression LIKE ? ESCAPE '\\' "
+            f"ORDER BY seq DESC LIMIT ?", (_NO_SEQ if before is None else before, pattern, limit))
+
+    def clear(self) -> None:
+        """Delete every entry."""
+        with self._conn:
+            self._conn.execute("DELETE FROM history")
+        self._count = 0
+
+    def _items(self, sql: str, parameters: tuple) -> List[Dict]:
+        """Run a query selecting _COLUMNS and return history item dicts."""
+        cursor = self._conn.cursor()
+        cursor.row_factory = _row_to_item
+        return cursor.execute(sql, parameters).fetchall()
+
+    def _adjust_count(self, delta: int) -> None:
+        """Keep the cached entry count in step with inserts and deletes."""
+        if self._count is not None:
+            self._count += delta
@@ -2,27 +2,127 @@
 """
 Calculator Application
 Professional calculator with real-time calculation and history.
+
+Use --batch to evaluate expressions headlessly; that path never imports Qt.
+Use --profile-startup to print startup phase timings instead of running.
 """
 
+import argparse
 import sys
-from PyQt6.QtWidgets import QApplication
-from calculator_app import CalculatorApp
+import time
 
+_STARTED = time.perf_counter()
 
-def main():
-    """Run the calculator application."""
+
+def _positive_int(value: str) -> int:
+    """Argparse type accepting integers of at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+class StartupProfile:
+    """Records how long each startup phase took."""
+    
+    def __init__(self):
+        """Initialize with the clock started when this module was imported."""
+        self.phases = []
+        self._last = _STARTED
+    
+    def mark(self, phase: str) -> None:
+        """End the current phase under the given name."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+    
+    def report(self) -> str:
+        """Render phase timings and the total in milliseconds."""
+        lines = [f"{phase:<24}{seconds * 1000:>9.1f} ms" for phase, seconds in self.phases]
+        lines.append(f"{'time to interactive':<24}{(self._last - _STARTED) * 1000:>9.1f} ms")
+        return "\n".join(lines)
+
+
+def run_gui(argv, history_path=None, profile=None):
+    """Run the calculator GUI.
+    
+    With a StartupProfile, stop once the first frame is shown and print
+    the phase timings to stderr.
+    """
+    mark = profile.mark if profile else (lambda phase: None)
+    
+    from PyQt6.QtWidgets import QApplication
+    mark("import Qt")
+    from calculator_app import CalculatorApp
+    mark("import calculator")
+    
     # Create application
-    app = QApplication(sys.argv)
+    app = QApplication(argv)
     app.setApplicationName("Professional Calculator")
     app.setApplicationVersion("1.0")
+    mark("create QApplication")
     
     # Create and show calculator window
-    calculator = CalculatorApp()
+    calculator = CalculatorApp(history_path)
+    mark("build window")
     calculator.show()
     
+    if profile:
+        # Handle the show's layout, polish and paint events: the first frame
+        app.processEvents()
+        mark("first frame")
+        print(profile.report(), file=sys.stderr)
+        sys.exit(0)
+    
     # Run application
     sys.exit(app.exec())
 
 
+def main():
+    """Run the calculator application or the headless batch mode."""
+    parser = argparse.ArgumentParser(
+        description="Professional Calculator",
+        epilog="Example: python src/main.py --batch expressions.txt --workers 4 > results.txt"
+    )
+    parser.add_argument(
+        "--batch",
+        nargs="*",
+        metavar="FILE",
+        help="Evaluate expressions line by line from files (or stdin) without the GUI"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for --batch; output order is preserved (default: 1)"
+    )
+    parser.add_argument(
+        "--history",
+        metavar="PATH",
+        help="History database (default: $CALCULATOR_HISTORY or ~/.calculator/history.db)"
+    )
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print import and construction timings up to the first frame, then exit"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=_positive_int,
+        help="Lines evaluated per batch chunk (default: batch_runner.DEFAULT_CHUNK_SIZE)"
+    )
+    
+    # Unrecognized options (e.g. -platform) are passed through to Qt
+    args, qt_args = parser.parse_known_args()
+    
+    if args.batch is not None:
+        from batch_runner import DEFAULT_CHUNK_SIZE, run_batch
+        sys.exit(run_batch(args.batch, workers=args.workers,
+                           chunk_size=args.chunk_size or DEFAULT_CHUNK_SIZE))
+    
+    run_gui(sys.argv[:1] + qt_args, args.history,
+            StartupProfile() if args.profile_startup else None)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,183 @@
+"""
+Numeric Backends
+Number representations the calculator engine can evaluate with.
+"""
+
+import decimal
+import math
+from contextlib import nullcontext
+from fractions import Fraction
+from typing import Callable, List, Optional, Tuple, Union
+
+from expression_parser import BINARY_OPERATORS, parse_number
+
+
+FLOAT = 'float'
+DECIMAL = 'decimal'
+FRACTION = 'fraction'
+BACKENDS = (FLOAT, DECIMAL, FRACTION)
+
+ExactNumber = Union[int, decimal.Decimal, Fraction]
+
+_LOG10_2 = math.log10(2)
+
+
+def _load_gmpy2():
+    """Import gmpy2 on demand; big-number formatting falls back to Python ints."""
+    try:
+        import gmpy2
+    except ImportError:
+        return None
+    return gmpy2
+
+
+class NumericBackend:
+    """Literal conversion and operators for one number representation."""
+
+    def __init__(self, name: str, parse_literal: Callable, operators: dict,
+                 context: Optional[decimal.Context] = None):
+        """Initialize backend.
+
+        Args:
+            name: Backend name (one of BACKENDS)
+            parse_literal: Converts numeric literal text into a number
+            operators: Binary operator functions keyed by symbol
+            context: Decimal context active while evaluating, if any
+        """
+        self.name = name
+        self.parse_literal = parse_literal
+        self.operators = operators
+        self.context = context
+
+    def activate(self):
+        """Return a context manager installing this backend's decimal context."""
+        if self.context is None:
+            return nullcontext()
+        return decimal.localcontext(self.context)
+
+
+def _decimal_literal(text: str) -> ExactNumber:
+    """Parse a literal exactly, keeping integers as int."""
+    if '.' in text:
+        return decimal.Decimal(text)
+    return parse_number(text)
+
+
+def _fraction_literal(text: str) -> ExactNumber:
+    """Parse a literal exactly, keeping integers as int."""
+    if '.' in text:
+        return Fraction(text)
+    return parse_number(text)
+
+
+def create_backend(name: str, decimal_context: Optional[decimal.Context] = None) -> NumericBackend:
+    """Create the backend called name.
+
+    Raises:
+        ValueError: If name is not a known backend
+    """
+    if name == FLOAT:
+        return NumericBackend(FLOAT, parse_number, BINARY_OPERATORS)
+
+    if name == DECIMAL:
+        operators = dict(BINARY_OPERATORS)
+        operators['/'] = lambda a, b: decimal.Decimal(a) / decimal.Decimal(b)
+        return NumericBackend(DECIMAL, _decimal_literal, operators,
+                              decimal_context or decimal.Context())
+
+    if name == FRACTION:
+        operators = dict(BINARY_OPERATORS)
+        operators['/'] = lambda a, b: Fraction(a) / b
+        return NumericBackend(FRACTION, _fraction_literal, operators)
+
+    raise ValueError(f"Unknown numeric backend: {name!r} (expected one of {', '.join(BACKENDS)})")
+
+
+def is_integer_only(tokens: List[str]) -> bool:
+    """Check whether tokens use only integer literals and no division.
+
+    Such expressions evaluate exactly with native ints, so every backend
+    can take the fast path and produce identical results.
+    """
+    return '/' not in tokens and not any('.' in token for token in tokens)
+
+
+def format_exact(value: ExactNumber, places: int) -> str:
+    """Round an exact number half-to-even and format it without trailing zeros."""
+    scaled = round(Fraction(value) * 10 ** places)
+    if places <= 0:
+        return str(scaled * 10 ** -places)
+
+    digits = str(abs(scaled)).rjust(places + 1, '0')
+    whole, fraction = digits[:-places], digits[-places:].rstrip('0')
+    sign = '-' if scaled < 0 else ''
+    return f"{sign}{whole}.{fraction}" if fraction else f"{sign}{whole}"
+
+
+def format_integer(value: int) -> str:
+    """Format an int exactly, beyond Python's int-to-str digit limit if needed."""
+    try:
+        return str(value)
+    except ValueError:
+        gmpy2 = _load_gmpy2()
+        if gmpy2 is None:
+            raise
+        return str(gmpy2.mpz(value))
+
+
+def _scientific_digits(value: Union[int, Fraction], places: int) -> Tuple[int, int]:
+    """Return (mantissa, exponent) with abs(value) ~= mantissa * 10**(exponent - places).
+
+    The mantissa has exactly places + 1 digits and is rounded half-to-even.
+    Only integer arithmetic is used (on gmpy2 mpz when available), so the
+    cost stays far below a full decimal conversion of a huge value.
+    """
+    value = abs(value)
+    numerator, denominator = value.numerator, value.denominator
+    gmpy2 = _load_gmpy2()
+    if gmpy2 is not None:
+        numerator, denominator = gmpy2.mpz(numerator), gmpy2.mpz(denominator)
+
+    def scaled(power: int) -> Tuple[int, int]:
+        # value * 10**power as a (numerator, denominator) pair
+        if power >= 0:
+            return numerator * 10 ** power, denominator
+        return numerator, denominator * 10 ** -power
+
+    # floor(log10(value)) from bit lengths is off by at most one either way
+    exponent = math.floor((numerator.bit_length() - denominator.bit_length()) * _LOG10_2)
+    while True:
+        top, bottom = scaled(-exponent)
+        if top < bottom:
+            exponent -= 1
+        elif top >= 10 * bottom:
+            exponent += 1
+        else:
+            break
+
+    top, bottom = scaled(places - exponent)
+    mantissa, remainder = divmod(top, bottom)
+    if 2 * remainder > bottom or (2 * remainder == bottom and mantissa % 2):
+        mantissa += 1
+    if mantissa == 10 ** (places + 1):
+        mantissa //= 10
+        exponent += 1
+    return int(mantissa), exponent
+
+
+def format_scientific(value: Union[float, ExactNumber], places: int) -> str:
+    """Format value as a mantissa with up to places decimals and an exponent (1.5e+21)."""
+    if isinstance(value, (float, decimal.Decimal)):
+        text = f"{value:.{max(places, 0)}e}"
+    elif value == 0:
+        text = "0e+00"
+    else:
+        mantissa, exponent = _scientific_digits(value, max(places, 0))
+        digits = str(mantissa)
+        sign = '-' if value < 0 else ''
+        text = f"{sign}{digits[0]}.{digits[1:]}e{exponent:+03d}"
+
+    mantissa, e, exponent = text.partition('e')
+    if '.' in mantissa:
+        mantissa = mantissa.rstrip('0').rstrip('.')
+    return f"{mantissa}{e}{exponent}"
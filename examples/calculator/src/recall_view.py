@@ -0,0 +1,150 @@
+"""
+Recall View
+Searchable list of saved calculations, fetched from the history store a
+page at a time.
+"""
+
+from typing import Dict, List, Optional
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, Qt
+from PyQt6.QtWidgets import QDialog, QDialogButtonBox, QLineEdit, QListView, QVBoxLayout
+
+from history_store import HistoryStore, fuzzy_match
+
+
+# Entries read from the store per fetch
+PAGE_SIZE = 100
+
+
+class HistoryListModel(QAbstractListModel):
+    """List model over a HistoryStore, newest first, loaded lazily.
+
+    Creating the model reads a single page however long the history is;
+    views request further pages through canFetchMore/fetchMore as they
+    scroll. A filter keeps entries whose expression fuzzy-matches it.
+    """
+
+    ItemRole = Qt.ItemDataRole.UserRole  # The history item dict of a row
+
+    def __init__(self, store: HistoryStore, page_size: int = PAGE_SIZE, parent=None):
+        """Initialize model and fetch the first page."""
+        super().__init__(parent)
+        self.store = store
+        self.page_size = page_size
+        self.filter_text = ""
+        self._items = []
+        self._before = None  # Seq the next page continues from (None: the newest)
+        self._exhausted = False
+        self.fetchMore()
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        item = self._items[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{item['name']}: {item['expression']} = {item['result']}"
+        if role == self.ItemRole:
+            return item
+        return None
+
+    def canFetchMore(self, parent: QModelIndex = QModelIndex()) -> bool:
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent: QModelIndex = QModelIndex()) -> None:
+        """Append the next page of (matching) entries."""
+        if parent.isValid() or self._exhausted:
+            return
+        page = self._fetch_page()
+        if len(page) < self.page_size:
+            self._exhausted = True
+        if not page:
+            return
+        self._before = page[-1]['seq']
+        first = len(self._items)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._items.extend(page)
+        self.endInsertRows()
+
+    def item(self, row: int) -> Dict:
+        """Return the history item shown in a row."""
+        return self._items[row]
+
+    def set_filter(self, text: str) -> None:
+        """Show only entries fuzzy-matching text.
+
+        When the previous filter text is a subsequence of the new one (as
+        when typing another character), its matches are a superset of the
+        new ones: loaded rows are narrowed in memory and the store scan
+        resumes where it stopped instead of starting over.
+        """
+        if text == self.filter_text:
+            return
+        refine = fuzzy_match(self.filter_text, text)
+        self.beginResetModel()
+        if refine:
+            self._items = [item for item in self._items if fuzzy_match(text, item['expression'])]
+        else:
+            self._items, self._before, self._exhausted = [], None, False
+        self.filter_text = text
+        self.endResetModel()
+
+        # Top up a narrowed list so the view starts with a full page
+        if len(self._items) < self.page_size:
+            self.fetchMore()
+
+    def _fetch_page(self) -> List[Dict]:
+        """Read the page after the current scan position."""
+        if self.filter_text:
+            return self.store.fuzzy_search(self.filter_text, self.page_size, self._before)
+        return self.store.recent(self.page_size, self._before)
+
+
+class RecallDialog(QDialog):
+    """Recall picker: typing filters the list, Enter or a double-click picks."""
+
+    def __init__(self, store: HistoryStore, parent=None):
+        """Initialize dialog over a history store."""
+        super().__init__(parent)
+        self.setWindowTitle('Recall Calculation')
+        self.resize(360, 420)
+        self.model = HistoryListModel(store, parent=self)
+
+        self.filter_field = QLineEdit()
+        self.filter_field.setPlaceholderText("Type to filter...")
+        self.filter_field.textChanged.connect(self.on_filter_changed)
+        self.filter_field.returnPressed.connect(self.accept)
+
+        self.list_view = QListView()
+        self.list_view.setUniformItemSizes(True)  # Row heights are not measured one by one
+        self.list_view.setModel(self.model)
+        self.list_view.doubleClicked.connect(self.accept)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok
+                                   | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.filter_field)
+        layout.addWidget(self.list_view)
+        layout.addWidget(buttons)
+
+        self._select_first()
+
+    def on_filter_changed(self, text: str):
+        """Refilter and keep the best (most recent) match selected."""
+        self.model.set_filter(text)
+        self._select_first()
+
+    def selected_item(self) -> Optional[Dict]:
+        """Return the selected history item, if any."""
+        index = self.list_view.currentIndex()
+        return self.model.item(index.row()) if index.isValid() else None
+
+    def _select_first(self):
+        """Select the first row, if there is one."""
+        if self.model.rowCount():
+            self.list_view.setCurrentIndex(self.model.index(0))
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Calculator engine benchmarks.
+Measures throughput and p50/p99 latency of the engine's public entry points
+over a representative corpus and gates regressions against a stored baseline.
+
+Usage:
+    python test/benchmark.py                     # Run and compare to baseline (exit 2 if none)
+    python test/benchmark.py --update-baseline   # Record a new baseline
+    python test/benchmark.py --backends          # Compare numeric backends
+    python test/run_tests.py --bench             # Same, with a timestamped report
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Add src directory to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from calculator_engine import CalculatorEngine
+from numeric_backends import BACKENDS
+
+
+# Throughput is machine-specific, so the baseline is recorded locally (not committed)
+BASELINE_FILE = Path(__file__).parent / "benchmark_baseline.json"
+
+# Exit code of a gate run that had no baseline to compare against
+NO_BASELINE_EXIT = 2
+
+# Allowed fractional throughput drop before a run counts as a regression
+DEFAULT_THRESHOLD = 0.3
+
+# Representative inputs per category
+BENCHMARK_CORPUS = {
+    'short': ["2 + 3", "6 * 7", "15 / 3", "-5", "2.5 + 1.5", "2(3)", "10 - 6 / 2", "(2 + 3) * 4"],
+    'nested': [
+        "(" * 20 + "1" + " + 1)" * 20,
+        "((((1.5 + 2) * 3) - 4) / 5) * ((((6 - 7) * 8) + 9) / 10)",
+        "2(3(4(5(6(7(8(9))))))) - (((((1)))))",
+        "(1 + (2 * (3 - (4 / (5 + (6 * (7 - (8 / 9))))))))",
+    ],
+    'long_literal': [
+        "123456789012345678901234567890 * 987654321098765432109876543210",
+        "3.14159265358979323846264338327950288 * 2.71828182845904523536",
+        "99999999999999999999999999999999999999 + 1",
+        "0.000000000000000000000000000000000001 * 1000000000000000000000000000000000",
+    ],
+    'invalid': ["2 ++ 3", "(2 + 3", "1.2.3 + 4", "5 / 0", "* 3", "2 + a", "007 + 1", ")("],
+}
+
+
+def _ignore_errors(function: Callable) -> Callable:
+    """Wrap function so invalid inputs count as completed calls."""
+    def call(item):
+        try:
+            return function(item)
+        except ValueError:
+            return None
+    return call
+
+
+# Entry points under test, bound to a fresh engine
+BENCHMARK_TARGETS = {
+    'evaluate_expression': lambda engine: engine.evaluate_expression,
+    'validate_expression': lambda engine: engine.validate_expression,
+    '_sanitize_expression': lambda engine: _ignore_errors(engine._sanitize_expression),
+    'format_number_input': lambda engine: lambda item: engine.format_number_input(item, '.'),
+}
+
+
+# Expressions grouped by which evaluation path they exercise
+BACKEND_CORPUS = {
+    'integer (fast path)': ["2 + 3 * 4", "(12 - 7) * 8 + 1", "123456789 * 987654321", "-(4 + 5)(6 - 2)"],
+    'decimal literals': ["0.1 + 0.2", "19.99 * 3 - 4.75", "(1.05 * (3 + 4)) - 2.5", "-2.5 * 4.125"],
+    'division': ["1 / 3", "22 / 7 * 2", "(10 - 4) / (2 + 1)", "100 / 8 / 3"],
+}
+
+
+def time_per_call(function: Callable, inputs: List[str], repeat: int = 5,
+                  min_seconds: float = 0.05) -> float:
+    """Return the best observed time per call in microseconds."""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            for item in inputs:
+                function(item)
+        if time.perf_counter() - start >= min_seconds:
+            break
+        loops *= 2
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            for item in inputs:
+                function(item)
+        best = min(best, time.perf_counter() - start)
+
+    return best / (loops * len(inputs)) * 1e6
+
+
+def measure_latencies(function: Callable, inputs: List[str], min_seconds: float = 0.5,
+                      rounds: int = 5) -> Dict[str, float]:
+    """Time individual calls; return throughput and p50/p99 latency.
+
+    Throughput is the best of several rounds, which is far less sensitive
+    to scheduler noise than a single long run.
+    """
+    clock = time.perf_counter_ns
+    samples = []
+    best_throughput = 0.0
+
+    for _ in range(rounds):
+        round_samples = []
+        deadline = time.perf_counter() + min_seconds / rounds
+        while time.perf_counter() < deadline:
+            for item in inputs:
+                start = clock()
+                function(item)
+                round_samples.append(clock() - start)
+        best_throughput = max(best_throughput, len(round_samples) / (sum(round_samples) / 1e9))
+        samples.extend(round_samples)
+
+    samples.sort()
+    return {
+        'throughput': best_throughput,
+        'p50_us': samples[len(samples) // 2] / 1000,
+        'p99_us': samples[min(len(samples) - 1, int(len(samples) * 0.99))] / 1000,
+        'calls': len(samples),
+    }
+
+
+def run_benchmarks(corpus: Dict[str, List[str]] = BENCHMARK_CORPUS,
+                   min_seconds: float = 0.5) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """Measure every target on every corpus category."""
+    results = {}
+    for target, bind in BENCHMARK_TARGETS.items():
+        function = bind(CalculatorEngine())
+        results[target] = {category: measure_latencies(function, inputs, min_seconds)
+                           for category, inputs in corpus.items()}
+    return results
+
+
+def load_baseline(path: Path = BASELINE_FILE) -> Dict:
+    """Load stored baseline results, or an empty dict if none exist."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baseline(results: Dict, path: Path = BASELINE_FILE) -> None:
+    """Store results as the new baseline."""
+    path.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+
+def find_regressions(results: Dict, baseline: Dict,
+                     threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """List target/category pairs whose throughput fell beyond threshold."""
+    regressions = []
+    for target, categories in results.items():
+        for category, stats in categories.items():
+            reference = baseline.get(target, {}).get(category)
+            if not reference:
+                continue
+            change = stats['throughput'] / reference['throughput'] - 1
+            if change < -threshold:
+                regressions.append(
+                    f"{target}[{category}]: {stats['throughput']:,.0f} calls/s vs "
+                    f"baseline {reference['throughput']:,.0f} ({change:+.1%})"
+                )
+    return regressions
+
+
+def format_report(results: Dict, baseline: Dict) -> str:
+    """Render results as a table, with throughput change against baseline."""
+    lines = [f"{'target':<22}{'category':<14}{'calls/s':>12}{'p50 us':>10}{'p99 us':>10}{'vs base':>10}"]
+    for target, categories in results.items():
+        for category, stats in categories.items():
+            reference = baseline.get(target, {}).get(category)
+            change = f"{stats['throughput'] / reference['throughput'] - 1:+.1%}" if reference else "n/a"
+            lines.append(f"{target:<22}{category:<14}{stats['throughput']:>12,.0f}"
+                         f"{stats['p50_us']:>10.2f}{stats['p99_us']:>10.2f}{change:>10}")
+    return "\n".join(lines)
+
+
+def run_gate(threshold: float = DEFAULT_THRESHOLD, update_baseline: bool = False,
+             baseline_path: Path = BASELINE_FILE) -> Tuple[Dict, str, Optional[List[str]]]:
+    """Run the suite and compare against the baseline.
+
+    With update_baseline the run is recorded as the baseline instead.
+    Returns the results, a printable report and any regressions; regressions
+    is None when there is no baseline to compare against, which is not a pass.
+    """
+    results = run_benchmarks()
+    baseline = load_baseline(baseline_path)
+    report = format_report(results, baseline)
+
+    if update_baseline:
+        save_baseline(results, baseline_path)
+        return results, report + f"\n\nBaseline saved to: {baseline_path}", []
+    if not baseline:
+        report += (f"\n\nNo baseline at {baseline_path}; nothing was compared. "
+                   f"Run with --update-baseline to record one on this machine.")
+        return results, report, None
+
+    regressions = find_regressions(results, baseline, threshold)
+    if regressions:
+        report += f"\n\nThroughput regressions beyond {threshold:.0%}:\n" + "\n".join(regressions)
+    else:
+        report += f"\n\nNo throughput regressions beyond {threshold:.0%}"
+    return results, report, regressions
+
+
+def benchmark_backends(corpus: Dict[str, List[str]] = BACKEND_CORPUS) -> Dict[str, Dict[str, float]]:
+    """Measure microseconds per evaluate_expression call for every backend."""
+    results = {}
+    for backend in BACKENDS:
+        engine = CalculatorEngine(backend=backend)
+        results[backend] = {category: time_per_call(engine.evaluate_expression, expressions)
+                            for category, expressions in corpus.items()}
+    return results
+
+
+def print_backend_table(results: Dict[str, Dict[str, float]]) -> None:
+    """Print backend timings relative to the float backend."""
+    categories = list(next(iter(results.values())))
+    print(f"{'backend':<10}" + "".join(f"{category:>26}" for category in categories))
+    for backend, timings in results.items():
+        cells = "".join(
+            f"{timings[c]:>12.2f} us ({timings[c] / results['float'][c]:>5.2f}x)" for c in categories
+        )
+        print(f"{backend:<10}{cells}")
+
+
+def main() -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Calculator engine benchmarks")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Allowed throughput drop vs baseline (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record this run as the new baseline")
+    parser.add_argument("--backends", action="store_true",
+                        help="Compare numeric backends instead")
+    args = parser.parse_args()
+
+    if args.backends:
+        print_backend_table(benchmark_backends())
+        return 0
+
+    _, report, regressions = run_gate(args.threshold, args.update_baseline)
+    print(report)
+    if regressions is None:
+        return NO_BASELINE_EXIT
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Calculator GUI latency harness.
+Drives CalculatorApp headlessly through scripted button, typing and key
+sessions inside the Qt event loop and measures input-to-result latency,
+event-loop stalls and memory growth over many rounds.
+
+Usage:
+    python test/gui_benchmark.py                 # Run and check the budgets
+    python test/gui_benchmark.py --rounds 500    # Longer session
+    python test/run_tests.py --gui-bench         # Same, with a timestamped report
+"""
+
+import argparse
+import gc
+import os
+import sys
+from pathlib import Path
+from time import perf_counter, perf_counter_ns
+from typing import Callable, Dict, List, Tuple
+
+# No display needed; must be set before Qt is imported
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+# Add src directory to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from PyQt6.QtCore import QEvent, QEventLoop, Qt, QTimer
+from PyQt6.QtGui import QKeyEvent
+from PyQt6.QtWidgets import QApplication
+
+from calculator_app import CalculatorApp
+
+
+# Rounds of every session played by default
+DEFAULT_ROUNDS = 50
+
+# Event-loop heartbeat; a gap well beyond it means the loop was blocked
+HEARTBEAT_MS = 5
+
+# Budgets a run must stay within
+LATENCY_BUDGET_MS = 50.0        # p99 input-to-result latency per session
+STALL_MS = 50.0                 # Heartbeat gap counted as a stall
+MEMORY_BUDGET_BYTES = 16 << 20  # Resident memory growth after warm-up
+
+# Scripted sessions: each step is (driver, argument)
+SESSIONS = {
+    'buttons': [('button', text) for text in "12+34×(56-7)÷8"] + [('button', 'Clear')],
+    'typing': [('insert', char) for char in "(1.5+2.25)*4-7/3"] + [('button', 'Clear')],
+    'keys': [('key', char) for char in "99*(12-3)/4"] + [('key', '\b')] * 3 + [('button', 'Clear')],
+    'long_input': [('insert', char) for char in "(1+2+3+4+5+6+7+8+9)*(9-8-7-6-5-4-3-2-1)/3"]
+                  + [('button', 'Clear')],
+}
+
+
+def _key_event(char: str) -> QKeyEvent:
+    """Build the key press a keyboard would send for char ('\\b' is Backspace)."""
+    if char == '\b':
+        return QKeyEvent(QEvent.Type.KeyPress, Qt.Key.Key_Backspace, Qt.KeyboardModifier.NoModifier, '')
+    return QKeyEvent(QEvent.Type.KeyPress, Qt.Key(ord(char.upper())), Qt.KeyboardModifier.NoModifier, char)
+
+
+def _step_function(calculator: CalculatorApp, driver: str, argument: str) -> Callable:
+    """Bind one scripted step to the app entry point it exercises."""
+    if driver == 'button':
+        return lambda: calculator.on_button_click(argument)
+    if driver == 'insert':
+        return lambda: calculator.insert_character(argument)
+    # Keys go to the focused input field, as from a keyboard; the window's
+    # keyPressEvent only sees what the field passes up
+    event = _key_event(argument)
+    return lambda: QApplication.sendEvent(calculator.input_field, event)
+
+
+def resident_bytes() -> int:
+    """Return the current resident set size (peak where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def play(calculator: CalculatorApp, steps: List[Callable]) -> Tuple[List[int], List[float]]:
+    """Run steps one event-loop turn at a time, each after the previous result settled.
+
+    Returns input-to-result latencies in nanoseconds, as recorded when the
+    app displays a result, and the gaps in seconds between heartbeat ticks.
+    """
+    latencies = []
+    gaps = []
+    show_result = calculator.show_result
+
+    def recording_show_result(result):
+        show_result(result)
+        latencies.append(perf_counter_ns() - calculator.last_change_ns)
+
+    calculator.show_result = recording_show_result
+    loop = QEventLoop()
+    pending = iter(steps)
+    state = {'last_beat': perf_counter(), 'idle_ticks': 0}
+
+    def beat():
+        now = perf_counter()
+        gaps.append(now - state['last_beat'])
+        state['last_beat'] = now
+
+    def step():
+        # Let debounced and worker evaluations finish (and their queued
+        # results arrive) before the next input
+        busy = calculator.calc_timer.isActive() or calculator.pool.activeThreadCount()
+        state['idle_ticks'] = 0 if busy else state['idle_ticks'] + 1
+        if state['idle_ticks'] < 2:
+            return
+        function = next(pending, None)
+        if function is None:
+            loop.quit()
+            return
+        state['idle_ticks'] = 0
+        function()
+
+    heartbeat = QTimer()
+    heartbeat.setInterval(HEARTBEAT_MS)
+    heartbeat.timeout.connect(beat)
+    driver = QTimer()
+    driver.setInterval(0)
+    driver.timeout.connect(step)
+
+    heartbeat.start()
+    driver.start()
+    try:
+        loop.exec()
+    finally:
+        driver.stop()
+        heartbeat.stop()
+        del calculator.show_result
+    return latencies, gaps
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    """Return the q-quantile of samples (0 if there are none)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def run_gui_benchmarks(rounds: int = DEFAULT_ROUNDS) -> Dict:
+    """Play every session for the given rounds on one app and summarize."""
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    calculator = CalculatorApp(history_path=':memory:')
+    calculator.show()
+    app.processEvents()
+
+    steps = {name: [_step_function(calculator, *step) for step in script]
+             for name, script in SESSIONS.items()}
+
+    # One warm-up round so caches, fonts and pools are in place before measuring
+    for session in steps.values():
+        play(calculator, session)
+    gc.collect()
+    memory_start, objects_start = resident_bytes(), len(gc.get_objects())
+
+    results = {'sessions': {}}
+    all_gaps = []
+    for name, session in steps.items():
+        latencies, gaps = play(calculator, session * rounds)
+        all_gaps.extend(gaps)
+        latencies_ms = [latency / 1e6 for latency in latencies]
+        results['sessions'][name] = {
+            'results': len(latencies_ms),
+            'p50_ms': _percentile(latencies_ms, 0.5),
+            'p99_ms': _percentile(latencies_ms, 0.99),
+            'max_ms': max(latencies_ms, default=0.0),
+            'max_gap_ms': max(gaps, default=0.0) * 1000,
+        }
+
+    gc.collect()
+    results['stalls'] = sum(gap * 1000 > STALL_MS for gap in all_gaps)
+    results['max_gap_ms'] = max(all_gaps, default=0.0) * 1000
+    results['memory_growth_bytes'] = resident_bytes() - memory_start
+    results['object_growth'] = len(gc.get_objects()) - objects_start
+    results['rounds'] = rounds
+
+    calculator.close()
+    return results
+
+
+def find_violations(results: Dict) -> List[str]:
+    """List budget violations in a run."""
+    violations = []
+    for name, stats in results['sessions'].items():
+        if stats['p99_ms'] > LATENCY_BUDGET_MS:
+            violations.append(f"{name}: p99 input-to-result {stats['p99_ms']:.2f} ms "
+                              f"exceeds {LATENCY_BUDGET_MS:.0f} ms")
+    if results['stalls']:
+        violations.append(f"{results['stalls']} event-loop stalls over {STALL_MS:.0f} ms "
+                          f"(longest {results['max_gap_ms']:.1f} ms)")
+    if results['memory_growth_bytes'] > MEMORY_BUDGET_BYTES:
+        violations.append(f"resident memory grew {results['memory_growth_bytes'] / 2 ** 20:.1f} MiB "
+                          f"over {results['rounds']} rounds")
+    return violations
+
+
+def format_report(results: Dict) -> str:
+    """Render results as a table followed by session-wide figures."""
+    lines = [f"{'session':<12}{'results':>9}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'max gap ms':>12}"]
+    for name, stats in results['sessions'].items():
+        lines.append(f"{name:<12}{stats['results']:>9}{stats['p50_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+                     f"{stats['max_ms']:>10.3f}{stats['max_gap_ms']:>12.1f}")
+    lines.append("")
+    lines.append(f"rounds: {results['rounds']}, stalls over {STALL_MS:.0f} ms: {results['stalls']} "
+                 f"(longest gap {results['max_gap_ms']:.1f} ms)")
+    lines.append(f"memory growth: {results['memory_growth_bytes'] / 1024:,.0f} KiB resident, "
+                 f"{results['object_growth']:+,} Python objects")
+    return "\n".join(lines)
+
+
+def run_gate(rounds: int = DEFAULT_ROUNDS) -> Tuple[Dict, str, List[str]]:
+    """Run the harness and check the budgets.
+
+    Returns the results, a printable report and any budget violations.
+    """
+    results = run_gui_benchmarks(rounds)
+    report = format_report(results)
+    violations = find_violations(results)
+    if violations:
+        report += "\n\nBudget violations:\n" + "\n".join(violations)
+    else:
+        report += "\n\nAll GUI latency and memory budgets met"
+    return results, report, violations
+
+
+def main() -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Calculator GUI latency harness")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS,
+                        help=f"Rounds of every scripted session (default: {DEFAULT_ROUNDS})")
+    args = parser.parse_args()
+
+    _, report, violations = run_gate(args.rounds)
+    print(report)
+    return 1 if violations else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,21 +2,32 @@
 """
 Simple test runner with timestamped output files.
 Runs pytest and saves results with timestamp: test_results_YYYY-MM-DD-HH:MM.txt
+With --bench, runs the engine benchmarks instead and saves
+benchmark_results_YYYY-MM-DD-HH:MM.txt (plus .json) in the same directory;
+--gui-bench does the same for the headless GUI latency harness
+(gui_benchmark_results_YYYY-MM-DD-HH:MM.txt).
 """
 
+import argparse
+import json
 import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
 
+def get_reports_dir():
+    """Return the reports directory, creating it if needed."""
+    reports_dir = Path(__file__).parent / "reports"
+    reports_dir.mkdir(exist_ok=True)
+    return reports_dir
+
 def run_tests():
     """Run pytest with timestamped output file."""
     # Generate timestamp for filename
     timestamp = datetime.now().strftime("%Y-%m-%d-%H:%M")
     
     # Create reports directory if it doesn't exist
-    reports_dir = Path(__file__).parent / "reports"
-    reports_dir.mkdir(exist_ok=True)
+    reports_dir = get_reports_dir()
     
     # Generate output filename with timestamp
     output_file = reports_dir / f"test_results_{timestamp}.txt"
@@ -50,5 +61,73 @@ def run_tests():
         print(f"Error running tests: {e}")
         return 1
 
+def run_benchmarks(threshold, update_baseline=False):
+    """Run engine benchmarks with timestamped output files."""
+    import benchmark
+    
+    timestamp = datetime.now().strftime("%Y-%m-%d-%H:%M")
+    reports_dir = get_reports_dir()
+    output_file = reports_dir / f"benchmark_results_{timestamp}.txt"
+    
+    print(f"Running benchmarks and saving results to: {output_file}")
+    
+    try:
+        results, report, regressions = benchmark.run_gate(threshold, update_baseline)
+        
+        # Write human-readable report and raw numbers side by side
+        output_file.write_text(report + "\n")
+        output_file.with_suffix(".json").write_text(json.dumps(results, indent=2))
+        
+        print(report)
+        print(f"\nBenchmark results saved to: {output_file}")
+        if regressions is None:
+            return benchmark.NO_BASELINE_EXIT
+        return 1 if regressions else 0
+        
+    except Exception as e:
+        print(f"Error running benchmarks: {e}")
+        return 1
+
+def run_gui_benchmarks(rounds):
+    """Run the GUI latency harness with timestamped output files."""
+    import gui_benchmark
+    
+    timestamp = datetime.now().strftime("%Y-%m-%d-%H:%M")
+    reports_dir = get_reports_dir()
+    output_file = reports_dir / f"gui_benchmark_results_{timestamp}.txt"
+    
+    print(f"Running GUI benchmarks and saving results to: {output_file}")
+    
+    try:
+        results, report, violations = gui_benchmark.run_gate(rounds)
+        
+        output_file.write_text(report + "\n")
+        output_file.with_suffix(".json").write_text(json.dumps(results, indent=2))
+        
+        print(report)
+        print(f"\nGUI benchmark results saved to: {output_file}")
+        return 1 if violations else 0
+        
+    except Exception as e:
+        print(f"Error running GUI benchmarks: {e}")
+        return 1
+
 if __name__ == "__main__":
-    sys.exit(run_tests())
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Run calculator tests or benchmarks")
+    parser.add_argument("--bench", action="store_true",
+                        help="Run engine benchmarks and fail on throughput regressions")
+    parser.add_argument("--threshold", type=float, default=0.3,
+                        help="Allowed throughput drop vs the stored baseline (default: 0.3)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Record this benchmark run as the new baseline")
+    parser.add_argument("--gui-bench", action="store_true",
+                        help="Run the headless GUI latency harness and fail on budget violations")
+    parser.add_argument("--rounds", type=int, default=50,
+                        help="Rounds of every scripted GUI session (default: 50)")
+    args = parser.parse_args()
+    
+    if args.bench:
+        sys.exit(run_benchmarks(args.threshold, args.update_baseline))
+    if args.gui_bench:
+        sys.exit(run_gui_benchmarks(args.rounds))
+    sys.exit(run_tests())
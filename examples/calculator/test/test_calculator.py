@@ -4,7 +4,7 @@ Essential tests for calculator functionality.
 """
 
 import pytest
-from src.calculator_engine import CalculatorEngine
+from src.calculator_engine import CalculatorEngine, EvaluationBudget
 from src.calculator_app import CalculatorApp
 
 
@@ -70,6 +70,246 @@ class TestCalculatorEngine:
         # Should be formatted with max 8 decimal places
         assert len(result.split('.')[-1]) <= 8 if '.' in result else True
     
+    def test_implicit_multiplication(self):
+        """Test implicit multiplication next to parentheses."""
+        assert self.engine.evaluate_expression("2(3)") == "6"
+        assert self.engine.evaluate_expression("(2)3") == "6"
+        assert self.engine.evaluate_expression("(2)(3)4") == "24"
+        assert self.engine.evaluate_expression("2.(3)") == "?"
+    
+    def test_malformed_expressions(self):
+        """Test parser rejection of malformed input."""
+        assert self.engine.evaluate_expression("()") == "?"
+        assert self.engine.evaluate_expression(")2(") == "?"
+        assert self.engine.evaluate_expression("1.2.3") == "?"
+        assert self.engine.evaluate_expression("007") == "?"
+        assert self.engine.evaluate_expression("2 --- 3") == "?"
+        assert self.engine.evaluate_expression("2 -- 3") == "5"
+        assert self.engine.evaluate_expression("__import__('os')") == "?"
+    
+    def test_result_cache(self):
+        """Test LRU result cache keyed on canonical expressions."""
+        engine = CalculatorEngine(cache_size=2)
+        assert engine.evaluate_expression("2 (3)") == "6"
+        assert engine.evaluate_expression("2*(3)") == "6"  # Same canonical key
+        assert engine.cache_info()['hits'] == 1
+        
+        engine.evaluate_expression("1 + 1")
+        engine.evaluate_expression("1 / 3")  # Evicts "2*(3)"
+        info = engine.cache_info()
+        assert info['size'] == 2
+        assert info['evictions'] == 1
+        assert info['misses'] == 3
+        
+        engine.max_decimal_places = 2
+        assert engine.cache_info()['size'] == 0
+        assert engine.evaluate_expression("1 / 3") == "0.33"
+    
+    def test_evaluate_many(self):
+        """Test batch evaluation matches per-call results and order."""
+        expressions = [f"({i}.5 * 2 - {i % 7}) / {i % 4}" for i in range(40)]
+        expressions += [f"{i} * 3 - 0.000000001" for i in range(20)]
+        expressions += ["1 / 1000000000", "007 + 1", "2 ++ 3", "", "99999999999999999 * 3"]
+        expressions += expressions[:5]  # Duplicates
+        
+        results = self.engine.evaluate_many(iter(expressions))
+        assert results == [self.engine.evaluate_expression(e) for e in expressions]
+        assert "?" in results and "Too Small" in results
+    
+    def test_shared_subexpressions(self):
+        """Test batch-wide subexpression sharing matches per-call results."""
+        shared = "(1.05 * (3 + 4))"
+        expressions = [f"{shared} * {i} - (8 / (2 + 2))" for i in range(10)]
+        expressions += [f"{shared} / (9 - 5)", "2 ++ 3", ""]
+        expressions += expressions[:3]  # Duplicates
+    
+        results = self.engine.evaluate_many(expressions, share_subexpressions=True)
+        assert results == [self.engine.evaluate_expression(e) for e in expressions]
+    
+        info = self.engine.batch_info()
+        assert info['expressions'] == len(expressions)
+        assert info['groups_evaluated'] == 5  # (3+4), shared, (2+2), (8/...), (9-5)
+        assert info['groups_reused'] > 0
+        assert 0 < info['tokens_parsed'] < info['tokens_total']
+        assert 0 < info['work_eliminated'] < 1
+    
+    def test_evaluation_budget(self):
+        """Test pathological input is cut off with a distinct sentinel."""
+        assert self.engine.evaluate_expression("(" * 5000 + "1" + ")" * 5000) == "Too Complex"
+        assert self.engine.evaluate_expression("9" * 2000 + " + 1") == "Too Complex"
+        assert self.engine.evaluate_expression(" * ".join(["999999999"] * 500)) == "Too Complex"
+        assert self.engine.evaluate_expression("+".join(["1"] * 900)) == "900"
+        
+        engine = CalculatorEngine(budget=EvaluationBudget(max_depth=3, max_operations=4))
+        assert engine.evaluate_expression("-((1 + 2))") == "-3"
+        assert engine.evaluate_expression("-(((1 + 2)))") == "Too Complex"
+        assert engine.evaluate_expression("1 + 2 + 3 + 4 + 5 + 6") == "Too Complex"
+        assert engine.session().update("-(((1 + 2)))") == "Too Complex"
+        assert engine.evaluate_many(["-(((1 + 2)))"] * 20) == ["Too Complex"] * 20
+    
+    def test_oversized_input_is_rejected_unread(self):
+        """Test input longer than the budget allows costs nothing to reject."""
+        from time import perf_counter
+        from src.calculator_engine import BudgetExceeded
+        
+        oversized = "1+" * 5 * 10 ** 6 + "1"
+        engine = CalculatorEngine()
+        assert len(oversized) > engine.budget.max_length
+        
+        start = perf_counter()
+        for backend in ('float', 'decimal', 'fraction'):
+            engine.backend = backend
+            assert engine.evaluate_expression(oversized) == "Too Complex"
+            assert engine.session().update(oversized) == "Too Complex"
+            assert engine.calculation_graph().evaluate(oversized) == "Too Complex"
+            assert engine.evaluate_many([oversized], share_subexpressions=True) == ["Too Complex"]
+        engine.enable_metrics()
+        assert engine.evaluate_expression(oversized) == "Too Complex"
+        with pytest.raises(BudgetExceeded):
+            engine.compile(oversized)
+        assert perf_counter() - start < 0.5  # Reading 10M characters took seconds per call
+        
+        small = CalculatorEngine(budget=EvaluationBudget(max_operand_digits=10, max_operations=4))
+        assert small.evaluate_expression("1 + 2 + 3 + 4") == "10"
+        assert small.evaluate_expression(" " * 100 + "1") == "Too Complex"
+    
+    def test_scientific_notation(self):
+        """Test huge results switch to scientific notation on every path."""
+        product = "123456789012345678901234567890 * 987654321098765432109876543210"
+        assert self.engine.evaluate_expression(product) == "1.21932631e+59"
+        assert self.engine.evaluate_expression("10 * 10 * 10 * 10 * 10 * 10 * 10 * 10 * 10 * 10"
+                                               " * 10 * 10 * 10 * 10 * 10 * 10 * 10 * 10 * 10 * 10"
+                                               " * 10") == "1e+21"
+        assert self.engine.evaluate_expression("100000000000000000000") == "100000000000000000000"
+        assert self.engine.evaluate_expression("-2.5 * 1000000000000000000000") == "-2.5e+21"
+        
+        engine = CalculatorEngine(backend='fraction')
+        engine.scientific_threshold = 1000
+        assert engine.evaluate_expression("20000 / 3") == "6.66666667e+03"
+        assert engine.evaluate_expression("999.5") == "999.5"
+        
+        self.engine.scientific_threshold = 1e6
+        expressions = [f"{i}.5 * 123456 - {i}" for i in range(40)] + ["1 / 0", "0.000000001"]
+        results = self.engine.evaluate_many(expressions)
+        assert results == [self.engine.evaluate_expression(e) for e in expressions]
+        assert results[7:9] == ["925913", "1.049368e+06"]
+    
+    def test_metrics(self):
+        """Test opt-in phase timings, outcome counters and exports."""
+        assert self.engine.metrics is None
+        metrics = self.engine.enable_metrics()
+        for expression in ["2 + 3", "1 / 0", "0.000000001", "2 ++ 3", "(" * 200 + "1" + ")" * 200]:
+            self.engine.evaluate_expression(expression)
+        self.engine.validate_expression("2 + 3")
+        self.engine.session().update("1 +")
+        
+        exported = metrics.to_dict()
+        assert exported['results'] == {'ok': 1, 'invalid': 3, 'too_small': 1, 'too_complex': 1}
+        assert exported['exceptions']['ZeroDivisionError'] == 1
+        assert exported['phases']['total']['count'] == 5
+        assert exported['phases']['evaluate']['count'] == 2
+        assert {'tokenize', 'format', 'validate', 'session_update'} <= set(exported['phases'])
+        
+        text = metrics.to_prometheus()
+        assert '# TYPE calculator_phase_seconds histogram' in text
+        assert 'calculator_phase_seconds_count{phase="total"} 5' in text
+        assert 'calculator_results_total{outcome="too_small"} 1' in text
+        
+        self.engine.disable_metrics()
+        self.engine.evaluate_expression("2 + 3")
+        assert self.engine.metrics is None
+        assert metrics.phases['total'].count == 5
+    
+    def test_calculation_graph(self):
+        """Test named results recompute only dirty downstream entries in order."""
+        graph = self.engine.calculation_graph()
+        graph.set('rate', "0.5")
+        for i in range(100):
+            graph.set(f"c{i}", f"c{i - 1} + rate" if i else "rate")
+        graph.set('other', "rate * 4")
+        graph.set('total', "c99 + other")
+        assert graph.result('total') == "52"
+        
+        assert graph.set('c50', "c49 + 1") == "26"
+        assert graph.result('total') == "52.5"
+        assert graph.recomputed == 51  # c50..c99 and total, not other
+        
+        graph.set('c98', "c97 + 0.5")  # Same value: nothing downstream changes
+        assert graph.recomputed == 1
+        
+        with pytest.raises(ValueError):
+            graph.set('rate', "total / 2")
+        assert graph.expression('rate') == "0.5"
+        
+        assert graph.set('late', "missing * 2") == "?"
+        assert graph.set('missing', "21") == "21"
+        assert graph.result('late') == "42"
+        assert graph.evaluate("late + c0") == "42.5"
+    
+    def test_compiled_expression(self):
+        """Test compiled parametric expressions on scalars."""
+        compiled = self.engine.compile("(a + 2) * b")
+        assert compiled.variables == ['a', 'b']
+        assert compiled(1, 3) == 9
+        assert compiled(a=0.5, b=2) == 5.0
+        assert compiled.format(compiled(1, 1 / 3)) == "1"
+        assert self.engine.compile("2x(y)")(x=2, y=3) == 12
+        assert self.engine.compile("2×x ÷ y")(x=3, y=4) == self.engine.compile("2*x/y")(x=3, y=4) == 1.5
+        
+        with pytest.raises(ValueError):
+            self.engine.compile("a +")
+        with pytest.raises(ValueError, match="Invalid character"):
+            self.engine.compile("a % 2")
+        with pytest.raises(ValueError, match="Invalid character"):
+            self.engine.compile("é + 1")
+        with pytest.raises(TypeError):
+            compiled(1)
+        assert self.engine.evaluate_expression("a + 1") == "?"
+    
+    def test_compile_respects_budget(self):
+        """Test compile turns excessive nesting into BudgetExceeded instead of RecursionError."""
+        from src.calculator_engine import BudgetExceeded
+        
+        with pytest.raises(BudgetExceeded):
+            self.engine.compile("(" * 3000 + "a" + ")" * 3000)
+        with pytest.raises(BudgetExceeded):
+            self.engine.compile(" + ".join(["a"] * 999))
+        with pytest.raises(BudgetExceeded):
+            CalculatorEngine(budget=EvaluationBudget(max_operations=2)).compile("a + b + c + d")
+        assert self.engine.compile("(" * 50 + "a" + ")" * 50)(a=2.0) == 2.0
+    
+    def test_compiled_expression_arrays(self):
+        """Test vectorized evaluation and formatting of compiled expressions."""
+        numpy = pytest.importorskip("numpy")
+        compiled = self.engine.compile("a / b")
+        values = compiled(numpy.array([1.0, 1.0, 1.0]), numpy.array([4.0, 0.0, 1e9]))
+        assert compiled.format(values) == ["0.25", "?", "Too Small"]
+    
+    def test_evaluation_session(self):
+        """Test incremental session results match full evaluation."""
+        session = self.engine.session()
+        text = ""
+        for char in "(1 + 2)(3 / (4 - 4)) + 1":
+            text += char
+            assert session.update(text) == self.engine.evaluate_expression(text)
+        assert session.update("(1 + 2)(3 / (4 - 2))") == "4.5"
+    
+    def test_exact_backends(self):
+        """Test decimal and fraction backends avoid binary float artefacts."""
+        assert self.engine.evaluate_expression("1.005 * 1000") == "1004"  # Float artefact
+        
+        for backend in ('decimal', 'fraction'):
+            engine = CalculatorEngine(backend=backend)
+            assert engine.evaluate_expression("1.005 * 1000") == "1005"
+            assert engine.evaluate_expression("0.1 + 0.2") == "0.3"
+            assert engine.evaluate_expression("2 / 3") == "0.66666667"
+            assert engine.evaluate_expression("1 / 0") == "?"
+            assert engine.evaluate_expression("1 / 1000000000") == "Too Small"
+            assert engine.evaluate_expression("12345678901234567890 * 3") == "37037036703703703670"
+        
+        with pytest.raises(ValueError):
+            CalculatorEngine(backend='binary128')
+    
     def test_input_validation(self):
         """Test input character validation."""
         assert self.engine.is_valid_input_character('5')
@@ -77,6 +317,7 @@ class TestCalculatorEngine:
         assert self.engine.is_valid_input_character('.')
         assert self.engine.is_valid_input_character('(')
         assert not self.engine.is_valid_input_character('a')
+        assert self.engine.is_valid_input_character('a', allow_variables=True)
         assert not self.engine.is_valid_input_character('$')
     
     def test_expression_validation(self):
@@ -88,6 +329,183 @@ class TestCalculatorEngine:
         assert not self.engine.validate_expression("")
 
 
+class TestBenchmarkGate:
+    """Test benchmark regression detection."""
+    
+    def test_find_regressions(self):
+        """Test throughput drops beyond the threshold are reported."""
+        from benchmark import find_regressions
+        
+        baseline = {'evaluate_expression': {'short': {'throughput': 1000.0},
+                                            'nested': {'throughput': 1000.0}}}
+        results = {'evaluate_expression': {'short': {'throughput': 900.0},
+                                           'nested': {'throughput': 600.0},
+                                           'invalid': {'throughput': 10.0}}}
+        regressions = find_regressions(results, baseline, threshold=0.25)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("evaluate_expression[nested]")
+    
+    def test_missing_baseline_is_not_a_pass(self, tmp_path, monkeypatch):
+        """Test a gate run without a baseline fails distinctly until one is recorded."""
+        import benchmark
+        
+        results = {'evaluate_expression': {'short': {'throughput': 1000.0, 'p50_us': 1.0, 'p99_us': 2.0}}}
+        monkeypatch.setattr(benchmark, "run_benchmarks", lambda: results)
+        baseline_path = tmp_path / "baseline.json"
+        
+        _, report, regressions = benchmark.run_gate(baseline_path=baseline_path)
+        assert regressions is None
+        assert "--update-baseline" in report
+        assert not baseline_path.exists()
+        
+        _, report, regressions = benchmark.run_gate(update_baseline=True, baseline_path=baseline_path)
+        assert regressions == [] and "Baseline saved" in report
+        _, report, regressions = benchmark.run_gate(baseline_path=baseline_path)
+        assert regressions == [] and "No throughput regressions" in report
+
+
+class TestBatchRunner:
+    """Test headless batch evaluation."""
+    
+    def test_evaluate_chunks_preserves_order(self):
+        """Test chunked streaming keeps results aligned with input lines."""
+        from src.batch_runner import chunked, evaluate_chunks
+        
+        lines = ["1 + 1", "", "2(3)", "5 / 0"] * 3
+        results = [r for chunk in evaluate_chunks(chunked(lines, 5)) for r in chunk]
+        assert results == ["2", "?", "6", "?"] * 3
+    
+    def test_batch_mode_skips_qt(self):
+        """Test --batch streams results without importing PyQt."""
+        import subprocess
+        import sys
+        from pathlib import Path
+        
+        src_dir = Path(__file__).parent.parent / 'src'
+        script = ("import sys, runpy; sys.argv = ['main.py', '--batch']\n"
+                  "try:\n    runpy.run_path('main.py', run_name='__main__')\n"
+                  "except SystemExit:\n    pass\n"
+                  "print('qt' if any(m.startswith('PyQt') for m in sys.modules) else 'no-qt')")
+        result = subprocess.run([sys.executable, '-c', script], input="1+2\n7 * 6\n",
+                                capture_output=True, text=True, cwd=src_dir)
+        assert result.stdout.split() == ["3", "42", "no-qt"]
+    
+    def test_batch_rejects_chunk_size_below_one(self):
+        """Test --chunk-size 0 is a usage error instead of silently dropping input."""
+        import subprocess
+        import sys
+        from pathlib import Path
+        
+        src_dir = Path(__file__).parent.parent / 'src'
+        for value in ("0", "-3"):
+            result = subprocess.run([sys.executable, 'main.py', '--batch', '--chunk-size', value],
+                                    input="1+2\n", capture_output=True, text=True, cwd=src_dir)
+            assert result.returncode == 2
+            assert "--chunk-size: must be at least 1" in result.stderr
+
+
+class TestCalculatorServer:
+    """Test the local evaluation server and pooled client."""
+    
+    def test_pipelined_round_trip(self):
+        """Test pipelined requests come back in order via micro-batches."""
+        import asyncio
+        from src.calc_client import CalculatorClient
+        from src.calc_server import CalculatorServer
+        
+        async def scenario():
+            server = CalculatorServer(max_batch=8)
+            host, port = await server.start(port=0)
+            expressions = [f"{i} * 2 + 1" for i in range(50)] + ["1 / 0", "2 ++ 3"]
+            try:
+                async with CalculatorClient(host, port, pool_size=3) as client:
+                    single = await client.evaluate("(2 + 3) * 4")
+                    many = await client.evaluate_many(expressions)
+            finally:
+                await server.close()
+            return single, many, expressions, server.batcher.stats()
+        
+        single, many, expressions, stats = asyncio.run(scenario())
+        assert single == "20"
+        assert many == [CalculatorEngine().evaluate_expression(e) for e in expressions]
+        assert stats['requests'] == 53
+        assert stats['batches'] < stats['requests']
+    
+    def test_cancelled_request_keeps_connection_usable(self):
+        """Test a response to a cancelled request is skipped and later requests still resolve."""
+        import asyncio
+        from src.calc_client import CalculatorClient
+        from src.calc_server import CalculatorServer
+        
+        async def scenario():
+            server = CalculatorServer(max_batch=64, max_delay=0.05)
+            host, port = await server.start(port=0)
+            try:
+                async with CalculatorClient(host, port, pool_size=1) as client:
+                    try:
+                        await asyncio.wait_for(client.evaluate("1 + 1"), 0.001)
+                    except asyncio.TimeoutError:
+                        pass
+                    return await asyncio.wait_for(client.evaluate("2 * 3"), 5)
+            finally:
+                await server.close()
+        
+        assert asyncio.run(scenario()) == "6"
+
+
+class TestHistoryStore:
+    """Test the persistent history store."""
+    
+    def test_persistence_retention_and_search(self, tmp_path):
+        """Test entries survive reopening, retention drops the oldest and search finds them."""
+        from src.history_store import HistoryStore
+        
+        store = HistoryStore(tmp_path / "history.db", retention=50)
+        for i in range(60):
+            store.append(f"{i} * 12 + 7", str(i * 12 + 7))
+        store.append("99 / 3", "33", name='r10')  # Out of the window; saved again
+        store.close()
+        
+        store = HistoryStore(tmp_path / "history.db", retention=50)
+        assert len(store) == 50
+        assert store.get('r1') is None
+        assert [item['name'] for item in store.recent(2)] == ['r10', 'r60']
+        page = store.recent(3, before=store.recent(2)[-1]['seq'])
+        assert [item['expression'] for item in page] == ["58 * 12 + 7", "57 * 12 + 7", "56 * 12 + 7"]
+        
+        assert [item['name'] for item in store.search("5", prefix=True, limit=3)] == ['r60', 'r59', 'r58']
+        assert [item['expression'] for item in store.search("15 * 1")] == ["15 * 12 + 7"]
+        assert len(store.search("/")) == 1
+        assert store.search("* 13") == []
+        store.close()
+    
+    def test_recall_model_fetches_lazily_and_filters(self):
+        """Test the recall model loads pages on demand and narrows fuzzy filters incrementally."""
+        from src.history_store import HistoryStore
+        from src.recall_view import HistoryListModel
+        
+        store = HistoryStore(':memory:')
+        for i in range(250):
+            store.append(f"{i} + {i % 10} * 2", str(i + i % 10 * 2))
+        
+        model = HistoryListModel(store, page_size=100)
+        assert model.rowCount() == 100 and model.canFetchMore()
+        model.fetchMore()
+        model.fetchMore()
+        assert model.rowCount() == 250 and not model.canFetchMore()
+        
+        model.set_filter("24")
+        narrowed = [model.item(row)['expression'] for row in range(model.rowCount())]
+        model.set_filter("249")
+        assert [model.item(row)['expression'] for row in range(model.rowCount())] == ["249 + 9 * 2"]
+        assert "249 + 9 * 2" in narrowed and "24 + 4 * 2" in narrowed
+        
+        model.set_filter("")
+        assert model.rowCount() == 100
+        assert model.data(model.index(0)) == "r250: 249 + 9 * 2 = 267"
+        store.close()
+
+
 class TestCalculatorApp:
     """Test calculator application functionality."""
     
@@ -102,25 +520,148 @@ class TestCalculatorApp:
         else:
             self.app = QApplication.instance()
             
-        self.calculator = CalculatorApp()
+        self.calculator = CalculatorApp(history_path=':memory:')
     
     def test_history_functionality(self):
-        """Test in-memory history management."""
+        """Test history management."""
         # Test saving calculations
-        self.calculator._save_calculation("2 + 3", "5")
-        self.calculator._save_calculation("10 - 4", "6")
+        self.calculator._save_calculation("2 + 3")
+        self.calculator._save_calculation("10 - 4")
         
         assert len(self.calculator.history_items) == 2
         assert self.calculator.history_items[0]['expression'] == "10 - 4"  # Most recent first
         assert self.calculator.history_items[1]['expression'] == "2 + 3"
+        assert self.calculator.history_items[1]['result'] == "5"
     
     def test_history_limit(self):
-        """Test history item limit (10 items max)."""
-        # Add more than 10 items
+        """Test the history retention window."""
+        self.calculator.history.retention = 10
         for i in range(15):
-            self.calculator._save_calculation(f"{i} + 1", str(i + 1))
+            self.calculator._save_calculation(f"{i} + 1")
         
         # Should only keep 10 most recent
+        assert len(self.calculator.history) == 10
         assert len(self.calculator.history_items) == 10
         assert self.calculator.history_items[0]['expression'] == "14 + 1"  # Most recent
-        assert self.calculator.history_items[9]['expression'] == "5 + 1"   # 10th most recent
\ No newline at end of file
+        assert self.calculator.history_items[9]['expression'] == "5 + 1"   # 10th most recent
+    
+    def test_saved_results_are_referenced_by_name(self):
+        """Test saved calculations can be referenced and edits flow downstream."""
+        self.calculator._save_calculation("2 + 3")
+        self.calculator._save_calculation("r1 * 2")
+        self.calculator.input_field.setText("r2 + 1")
+        assert self.calculator.result_field.text() == "11"
+        
+        self.calculator._save_calculation("4 + 3", name='r1')
+        assert [item['name'] for item in self.calculator.history_items] == ['r1', 'r2']
+        assert self.calculator.history_items[1]['result'] == "14"
+    
+    def test_profile_startup(self):
+        """Test --profile-startup reports phase timings up to the first frame and exits."""
+        import os
+        import subprocess
+        import sys
+        from pathlib import Path
+        
+        src_dir = Path(__file__).parent.parent / 'src'
+        result = subprocess.run([sys.executable, 'main.py', '--profile-startup', '--history', ':memory:'],
+                                capture_output=True, text=True, cwd=src_dir, timeout=60,
+                                env={**os.environ, 'QT_QPA_PLATFORM': 'offscreen'})
+        assert result.returncode == 0
+        phases = [line.rsplit(None, 2)[0] for line in result.stderr.splitlines() if line.endswith(" ms")]
+        assert phases == ["import Qt", "import calculator", "create QApplication",
+                          "build window", "first frame", "time to interactive"]
+    
+    def test_gui_benchmark_harness(self):
+        """Test the headless GUI harness plays every scripted session and reports on it."""
+        import os
+        import subprocess
+        import sys
+        from pathlib import Path
+        
+        script = Path(__file__).parent / 'gui_benchmark.py'
+        env = {key: value for key, value in os.environ.items() if key != 'QT_QPA_PLATFORM'}
+        result = subprocess.run([sys.executable, str(script), '--rounds', '2'],
+                                capture_output=True, text=True, timeout=60, env=env)
+        assert result.returncode in (0, 1), result.stderr
+        rows = {line.split()[0]: line.split()[1] for line in result.stdout.splitlines()[1:5]}
+        assert set(rows) == {'buttons', 'typing', 'keys', 'long_input'}
+        assert all(int(count) > 0 for count in rows.values())
+        assert "memory growth:" in result.stdout
+    
+    def test_recall_dialog(self):
+        """Test the recall dialog selects the newest fuzzy match."""
+        from src.recall_view import RecallDialog
+        
+        self.calculator._save_calculation("12 + 30")
+        self.calculator._save_calculation("7 * 6")
+        dialog = RecallDialog(self.calculator.history, self.calculator)
+        assert dialog.selected_item()['expression'] == "7 * 6"
+        dialog.filter_field.setText("1+3")
+        assert dialog.selected_item()['expression'] == "12 + 30"
+        dialog.filter_field.setText("9")
+        assert dialog.selected_item() is None
+    
+    def test_saved_references_load_lazily_after_restart(self, tmp_path):
+        """Test entries from an earlier session are loaded only when referenced."""
+        path = str(tmp_path / "history.db")
+        earlier = CalculatorApp(history_path=path)
+        earlier._save_calculation("2 + 3")
+        earlier._save_calculation("r1 * 4")
+        earlier.history.close()
+        
+        calculator = CalculatorApp(history_path=path)
+        assert len(calculator.calculations) == 0
+        calculator.input_field.setText("r2 + 1")
+        assert calculator.result_field.text() == "21"
+        assert calculator.calculations.names() == ['r1', 'r2']
+        
+        calculator._save_calculation("r1 + 1")
+        assert calculator.history_items[0]['name'] == 'r3'
+        calculator.history.close()
+    
+    def test_result_updates_on_every_keystroke(self):
+        """Test results refresh immediately as the input changes."""
+        self.calculator.input_field.setText("(2 + 3)")
+        assert self.calculator.result_field.text() == "5"
+        self.calculator.input_field.setText("(2 + 3)4")
+        assert self.calculator.result_field.text() == "20"
+        self.calculator.input_field.setText("(2 + 3)4 /")
+        assert self.calculator.result_field.text() == "?"
+    
+    def test_long_input_evaluates_off_the_gui_thread(self):
+        """Test long input goes to the worker and results for stale input are dropped."""
+        expression = "(" + " + ".join(["1"] * 12) + ")"
+        self.calculator.input_field.setText(expression)
+        self.calculator.input_field.setText(expression + " * 2")
+        assert self.calculator.result_field.text() == "0"  # Not evaluated on the GUI thread
+        
+        assert self.calculator.pool.waitForDone(5000)
+        self.app.processEvents()
+        assert self.calculator.result_field.text() == "24"
+        
+        self.calculator.on_worker_result(self.calculator.generation - 1, "12", 1.0)
+        assert self.calculator.result_field.text() == "24"
+    
+    def test_debounce_adapts_to_evaluation_cost(self):
+        """Test slow worker evaluations under fast typing are debounced, cheap ones are not."""
+        expression = "(" + " + ".join(["1"] * 12) + ")"
+        self.calculator.input_field.setText("2 + 3")
+        assert not self.calculator.calc_timer.isActive()
+        
+        self.calculator.evaluation_cost_ms = 200.0
+        self.calculator.keystroke_interval_ms = 40.0
+        self.calculator.input_field.setText(expression)
+        assert self.calculator.calc_timer.isActive()
+        assert 0 < self.calculator.calc_timer.interval() <= 250
+        
+        self.calculator.calc_timer.stop()
+        self.calculator.dispatch_pending()
+        assert self.calculator.pool.waitForDone(5000)
+        self.app.processEvents()
+        assert self.calculator.result_field.text() == "12"
+        assert self.calculator.evaluation_cost_ms < 200.0
+        
+        latencies = self.calculator.ui_metrics.to_dict()['phases']
+        assert latencies['keystroke_to_result']['count'] == 2
+        assert latencies['worker_evaluate']['count'] == 1
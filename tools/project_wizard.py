@@ -5,12 +5,287 @@ Interactive tool to create new projects with appropriate templates and tech stac
 """
 
 import os
+import re
 import sys
+import json
 import shutil
-import yaml
+import hashlib
 import argparse
+from contextlib import redirect_stdout
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from time import perf_counter
+from typing import Dict, List, Optional, Tuple
+
+
+APPLICATION_TYPES = ["web_app", "cli_tool", "api_service", "ml_system", "trading_dashboard"]
+
+
+# PRD placeholders are {UPPER_SNAKE_CASE}; other braces, like {model_name}, are literal text
+PLACEHOLDER_PATTERN = re.compile(r"\{([A-Z][A-Z0-9_]*)\}")
+
+# Directories every project gets under deliverables/
+DELIVERABLE_DIRS = ["src", "test", "docs"]
+
+# Starter content for project_structure files by extension; others start empty
+STRUCTURE_BOILERPLATE = {
+    ".ipynb": '{"cells": [], "metadata": {}, "nbformat": 4, "nbformat_minor": 5}\n',
+}
+
+# Hashes of the files the wizard wrote, kept in each generated project
+GENERATION_MANIFEST = ".wizard_manifest.json"
+GENERATION_MANIFEST_VERSION = 1
+
+# Persistent stack index, kept next to the stack profiles
+STACK_INDEX_FILE = ".stack_index.json"
+STACK_INDEX_VERSION = 1
+
+# Top-level profile keys the index records for listing and selection
+STACK_SUMMARY_KEYS = ("name", "description", "application_types")
+
+# Plain YAML scalars that do not load as strings
+_YAML_SPECIAL_SCALARS = {"", "~", "null", "true", "false", "yes", "no", "on", "off"}
+
+
+def _plain_scalar(value: str) -> Optional[str]:
+    """Return the string a simple YAML scalar loads as, or None if it is not simple."""
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        inner = value[1:-1]
+        return None if value[0] in inner or "\\" in inner else inner
+    if (value.lower() in _YAML_SPECIAL_SCALARS or value[0] in "[]{}&*!|>'\"%@`#,?:-"
+            or "#" in value or ": " in value or not any(char.isalpha() for char in value)):
+        return None
+    return value
+
+
+def _scan_stack_summary(text: str) -> Optional[Dict]:
+    """Read a stack profile's summary keys without a YAML parser.
+    
+    Handles the flat layout the profiles use (quoted or plain scalars and
+    flow lists on top-level lines) and returns None for anything else, so
+    callers can fall back to a full YAML parse.
+    """
+    summary = {}
+    for line in text.splitlines():
+        key, separator, value = line.partition(":")
+        if not separator or key not in STACK_SUMMARY_KEYS:
+            continue
+        if key in summary:
+            return None
+        value = value.strip()
+        if key == "application_types":
+            if not (value.startswith("[") and value.endswith("]")):
+                return None
+            parsed = [_plain_scalar(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+            if None in parsed:
+                return None
+        else:
+            parsed = _plain_scalar(value)
+            if parsed is None:
+                return None
+        summary[key] = parsed
+    return summary if len(summary) == len(STACK_SUMMARY_KEYS) else None
+
+
+def _load_data_file(path: Path):
+    """Load a JSON file, or YAML for any other extension."""
+    with open(path, 'r') as f:
+        if path.suffix == ".json":
+            return json.load(f)
+        import yaml
+        return yaml.safe_load(f)
+
+
+def _content_hash(data: bytes) -> str:
+    """Return the hex SHA-256 of file content."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    """Replace a file's content in one step, keeping its permissions."""
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temp_path, 'w') as f:
+            f.write(content)
+        if path.exists():
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def _expand_structure(entries: List[str], project_name: str) -> Tuple[List[str], List[str]]:
+    """Expand a stack's project_structure into directory and file paths.
+    
+    Entries are indented two spaces per level below their directory, and
+    directories end with '/'; {project_name} is substituted. Returns
+    relative POSIX paths of directories and of files.
+    """
+    directories = []
+    files = []
+    parents = []  # (indent, directory path) of the enclosing directories
+    for entry in entries:
+        name = entry.strip()
+        if not name:
+            continue
+        indent = len(entry) - len(entry.lstrip())
+        while parents and parents[-1][0] >= indent:
+            parents.pop()
+        path = (f"{parents[-1][1]}/" if parents else "") + name.rstrip("/").replace("{project_name}", project_name)
+        if path.startswith("/") or ".." in path.split("/"):
+            raise ValueError(f"project_structure entry escapes the project: {entry!r}")
+        if name.endswith("/"):
+            directories.append(path)
+            parents.append((indent, path))
+        else:
+            files.append(path)
+    return directories, files
+
+
+def _placeholder_value(value) -> str:
+    """Render an answer as PRD text; lists become comma-separated."""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    return str(value)
+
+
+class PrdTemplate:
+    """PRD template compiled once into alternating literal and placeholder segments.
+    
+    Rendering fills every placeholder in one pass over the segments, so
+    values are inserted verbatim (never re-scanned for placeholders).
+    Placeholders without a value are left in place for the user to fill.
+    """
+    
+    def __init__(self, text: str):
+        """Compile template text."""
+        self.segments = PLACEHOLDER_PATTERN.split(text)  # Odd indexes hold placeholder keys
+        self.keys = self.segments[1::2]
+        self.placeholders = list(dict.fromkeys(self.keys))  # Distinct, in order of appearance
+        self._unfilled = {key: f"{{{key}}}" for key in self.placeholders}
+    
+    def render(self, values: Dict[str, str]) -> str:
+        """Return the text with placeholders replaced by their values."""
+        filled = {**self._unfilled, **values}
+        parts = self.segments.copy()
+        parts[1::2] = [filled[key] for key in self.keys]
+        return "".join(parts)
+    
+    def missing(self, values: Dict[str, str]) -> List[str]:
+        """Return the placeholders values leave unfilled."""
+        return [key for key in self.placeholders if key not in values]
+
+
+class TechStackRegistry:
+    """Index of tech stack profiles by application type.
+    
+    The index is persisted next to the profiles and refreshed per file: an
+    entry whose mtime and size are unchanged is trusted, a touched file is
+    re-hashed and only re-read when its content changed. Full YAML is only
+    parsed for the stack that is actually used.
+    """
+    
+    def __init__(self, stacks_path: Path, index_path: Optional[Path] = None):
+        """Initialize registry over a directory of stack profiles."""
+        self.stacks_path = stacks_path
+        self.index_path = index_path or stacks_path / STACK_INDEX_FILE
+        self._stacks = None   # Filename -> summary and file signature, once refreshed
+        self._by_type = {}    # Application type -> filenames
+        self._profiles = {}   # Filename -> fully parsed profile
+    
+    def stacks(self) -> Dict[str, Dict]:
+        """Return every stack's summary by filename."""
+        if self._stacks is None:
+            self._refresh()
+        return self._stacks
+    
+    def stacks_for_type(self, app_type: str) -> Dict[str, Dict]:
+        """Return the summaries of stacks supporting an application type."""
+        stacks = self.stacks()
+        return {filename: stacks[filename] for filename in self._by_type.get(app_type, [])}
+    
+    def load(self, filename: str) -> Dict:
+        """Return a stack profile parsed in full."""
+        if filename not in self._profiles:
+            import yaml
+            with open(self.stacks_path / filename, 'r') as f:
+                self._profiles[filename] = yaml.safe_load(f)
+        return self._profiles[filename]
+    
+    def _refresh(self) -> None:
+        """Bring the index up to date with the profiles on disk."""
+        index = self._read_index()
+        stacks = {}
+        changed = False
+        
+        for entry in sorted(os.scandir(self.stacks_path), key=lambda entry: entry.name):
+            if not entry.name.endswith(".yaml") or not entry.is_file():
+                continue
+            stat = entry.stat()
+            cached = index.get(entry.name)
+            if cached and cached['mtime_ns'] == stat.st_mtime_ns and cached['size'] == stat.st_size:
+                stacks[entry.name] = cached
+                continue
+            try:
+                stacks[entry.name] = self._index_file(entry.name, stat, cached)
+                changed = True
+            except Exception as e:
+                print(f"⚠️  Error loading {entry.path}: {e}")
+        
+        if changed or stacks.keys() != index.keys():
+            self._write_index(stacks)
+        
+        self._stacks = stacks
+        self._by_type = {}
+        for filename, summary in stacks.items():
+            for app_type in summary['application_types']:
+                self._by_type.setdefault(app_type, []).append(filename)
+    
+    def _index_file(self, filename: str, stat: os.stat_result, cached: Optional[Dict]) -> Dict:
+        """Build the index entry for a new or modified profile."""
+        data = (self.stacks_path / filename).read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        
+        if cached and cached['sha256'] == digest:
+            # Touched but unchanged
+            summary = {key: cached[key] for key in STACK_SUMMARY_KEYS}
+        else:
+            text = data.decode('utf-8')
+            summary = _scan_stack_summary(text)
+            if summary is None:
+                import yaml
+                profile = yaml.safe_load(text)
+                self._profiles[filename] = profile
+                summary = {
+                    'name': profile.get('name', filename),
+                    'description': profile.get('description', ""),
+                    'application_types': list(profile.get('application_types', [])),
+                }
+        
+        summary.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size, sha256=digest)
+        return summary
+    
+    def _read_index(self) -> Dict[str, Dict]:
+        """Return the persisted entries, or none if the index is missing or stale."""
+        try:
+            with open(self.index_path, 'r') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(index, dict) or index.get('version') != STACK_INDEX_VERSION:
+            return {}
+        return index.get('stacks', {})
+    
+    def _write_index(self, stacks: Dict[str, Dict]) -> None:
+        """Persist the index atomically; a read-only install just goes without."""
+        temp_path = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump({'version': STACK_INDEX_VERSION, 'stacks': stacks}, f, indent=1)
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            temp_path.unlink(missing_ok=True)
 
 
 class ProjectWizard:
@@ -21,7 +296,11 @@ class ProjectWizard:
         self.framework_path = Path(__file__).parent.parent
         self.templates_path = self.framework_path / "templates" / "application_types"
         self.tech_stacks_path = self.framework_path / "tech_stacks"
+        self.stack_registry = TechStackRegistry(self.tech_stacks_path)
+        self._templates = {}  # Application type -> compiled PrdTemplate (None if missing)
+        self.answers = {}     # Placeholder values shared by every generated PRD
         self.args = args
+        self.dry_run = bool(args and getattr(args, 'dry_run', False))
         
     def run(self) -> None:
         """Run the interactive project wizard."""
@@ -34,11 +313,11 @@ class ProjectWizard:
         tech_stack = self._select_tech_stack(app_type)
         project_path = self._get_project_path(project_name)
         
-        # Create project
-        self._create_project_structure(project_path)
-        self._generate_prd(project_path, project_name, app_type)
-        self._setup_tech_stack(project_path, tech_stack)
-        self._create_framework_link(project_path)
+        self.create_project(project_path, project_name, app_type, tech_stack)
+        
+        if self.dry_run:
+            print(f"\n🔍 Dry run: nothing was written to {project_path}")
+            return
         
         print(f"\n✅ Project '{project_name}' created successfully!")
         print(f"📁 Location: {project_path}")
@@ -47,6 +326,177 @@ class ProjectWizard:
         print(f"2. Complete the PRD.md file with your specific requirements")
         print(f"3. Run: python -c 'import sys; sys.path.append(\"{self.framework_path}\"); from core.development_guide import start_development'")
         
+    def create_project(self, project_path: Path, project_name: str, app_type: str,
+                       tech_stack: Optional[Dict], placeholders: Optional[Dict] = None) -> Dict:
+        """Create or incrementally update a project from resolved choices.
+        
+        Returns a summary with the PRD placeholders left unfilled, the
+        number of files written (or that would be, in a dry run), the
+        generated files kept because they were edited, and the planned
+        (action, path) pairs.
+        """
+        outputs = {}
+        prd, missing = self._prd_content(project_name, app_type, placeholders)
+        if prd is not None:
+            outputs["deliverables/PRD.md"] = prd
+        requirements = self._requirements_content(tech_stack)
+        if requirements is not None:
+            outputs["deliverables/requirements.txt"] = requirements
+        outputs["CLAUDE.md"] = self._claude_md_content()
+        
+        directories, files = self._structure(project_name, tech_stack, outputs)
+        plan = self._plan_outputs(project_path, outputs)
+        actions = [("create", path) for path in directories + files if not (project_path / path).exists()]
+        actions += [(entry['action'], path) for path, entry in plan.items()]
+        if self.dry_run:
+            for action, path in actions:
+                print(f"  {action:<10} {project_path / path}")
+        elif not project_path.exists():
+            self._materialize_project(project_path, directories, files, plan)
+        else:
+            self._create_project_structure(project_path, directories, files)
+            self._apply_plan(project_path, plan)
+        
+        if missing:
+            print(f"📝 {len(missing)} placeholders left to fill: {', '.join(missing)}")
+        return {
+            'missing': missing,
+            'written': sum(1 for entry in plan.values() if entry['action'] in ("create", "update")),
+            'kept': [path for path, entry in plan.items() if entry['action'] == "keep"],
+            'actions': actions,
+        }
+    
+    def load_answers(self, answers_path: Optional[Path] = None,
+                     assignments: Optional[List[str]] = None) -> None:
+        """Set PRD placeholder values from an answers file and KEY=VALUE assignments.
+        
+        The answers file is a YAML or JSON mapping of placeholder names to
+        values; assignments override it.
+        """
+        answers = _load_data_file(answers_path) if answers_path else {}
+        if not isinstance(answers, dict):
+            raise ValueError(f"{answers_path} is not a mapping of placeholder values")
+        for assignment in assignments or []:
+            key, separator, value = assignment.partition("=")
+            if not separator:
+                raise ValueError(f"Expected KEY=VALUE, got: {assignment}")
+            answers[key.strip()] = value
+        self.answers = {str(key): _placeholder_value(value) for key, value in answers.items()}
+    
+    def run_manifest(self, manifest_path: Path, jobs: Optional[int] = None) -> int:
+        """Create every project listed in a manifest, several at a time.
+        
+        Templates and stack profiles are parsed once here and shared with
+        the worker processes. Projects are independent, so rerunning a
+        manifest only writes what changed. Returns the process exit code.
+        """
+        print("🚀 Claude Code Automation Framework - Bulk Project Generation")
+        print("=" * 50)
+        
+        specs = self._load_manifest(manifest_path)
+        self._preload(specs)
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(specs)))
+        
+        start = perf_counter()
+        if jobs == 1:
+            outcomes = [_generate_project(self, spec) for spec in specs]
+        else:
+            with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(self,)) as pool:
+                chunksize = max(1, len(specs) // (jobs * 4))  # Projects take milliseconds; batch them
+                outcomes = list(pool.map(_generate_in_worker, specs, chunksize=chunksize))
+        elapsed = perf_counter() - start
+        
+        if self.dry_run:
+            for outcome in outcomes:
+                changes = [(action, path) for action, path in outcome['actions'] if action != "unchanged"]
+                print(f"\n🔍 {outcome['name']}: {len(changes) or 'no'} changes planned")
+                for action, path in changes:
+                    print(f"  {action:<10} {Path(outcome['path']) / path}")
+        
+        print(f"\n{'Project':<30}{'Time':>10}{'Written':>9}{'Kept':>6}{'Unfilled':>10}  Location")
+        for outcome in outcomes:
+            if outcome['error']:
+                print(f"❌ {outcome['name']:<28}{outcome['seconds'] * 1000:>8.1f} ms{'':>25}  {outcome['error']}")
+            else:
+                print(f"✅ {outcome['name']:<28}{outcome['seconds'] * 1000:>8.1f} ms{outcome['written']:>9}"
+                      f"{len(outcome['kept']):>6}{len(outcome['missing']):>10}  {outcome['path']}")
+        
+        kept = [Path(outcome['path']) / path for outcome in outcomes for path in outcome['kept']]
+        if kept:
+            print(f"\n⚠️  Kept {len(kept)} files edited since they were generated:")
+            for path in kept:
+                print(f"  {path}")
+        
+        missing = sorted({key for outcome in outcomes for key in outcome['missing']})
+        if missing:
+            print(f"\n📝 Placeholders left to fill: {', '.join(missing)}")
+        
+        failed = sum(1 for outcome in outcomes if outcome['error'])
+        written = sum(outcome['written'] for outcome in outcomes)
+        print(f"\n📦 {len(outcomes) - failed}/{len(outcomes)} projects generated in {elapsed:.2f}s "
+              f"with {jobs} worker{'s' if jobs > 1 else ''}; {written} files "
+              f"{'would be written (dry run)' if self.dry_run else 'written'}")
+        return 1 if failed else 0
+    
+    def _load_manifest(self, manifest_path: Path) -> List[Dict]:
+        """Read and validate project specs from a YAML or JSON manifest.
+        
+        The manifest is a list of specs (or a mapping with a 'projects' list),
+        each with a name and optionally type, stack, placeholders and path.
+        Relative paths are resolved against the manifest's directory.
+        """
+        manifest = _load_data_file(manifest_path)
+        if isinstance(manifest, dict):
+            manifest = manifest.get('projects')
+        if not isinstance(manifest, list) or not manifest:
+            raise ValueError(f"{manifest_path} does not list any projects")
+        
+        specs = []
+        seen_paths = set()
+        for number, entry in enumerate(manifest, 1):
+            if not isinstance(entry, dict):
+                raise ValueError(f"Project {number} in {manifest_path} is not a mapping")
+            name = str(entry.get('name', ""))
+            if not name or not name.replace("_", "").replace("-", "").isalnum():
+                raise ValueError(f"Invalid project name in {manifest_path}: {name!r}")
+            app_type = entry.get('type', "cli_tool")
+            if app_type not in APPLICATION_TYPES:
+                raise ValueError(f"Invalid application type for {name}: {app_type}")
+            path = (manifest_path.parent / Path(entry.get('path') or name).expanduser()).resolve()
+            if path in seen_paths:
+                raise ValueError(f"Two projects in {manifest_path} share the location {path}")
+            seen_paths.add(path)
+            specs.append({
+                'name': name,
+                'type': app_type,
+                'stack': entry.get('stack'),
+                'placeholders': {str(key): _placeholder_value(value)
+                                 for key, value in (entry.get('placeholders') or {}).items()},
+                'path': path,
+            })
+        return specs
+    
+    def _preload(self, specs: List[Dict]) -> None:
+        """Parse the templates and stack profiles the specs use, once."""
+        for spec in specs:
+            self._template(spec['type'])
+            spec['stack'] = self._resolve_stack(spec['type'], spec['stack'])
+            if spec['stack']:
+                self.stack_registry.load(spec['stack'])
+    
+    def _resolve_stack(self, app_type: str, stack: Optional[str]) -> Optional[str]:
+        """Return the filename of a stack given by filename, stem or name (default: first for the type).
+        
+        Only stacks supporting the application type are accepted.
+        """
+        available = self.stack_registry.stacks_for_type(app_type)
+        if not stack:
+            return next(iter(available), None)
+        for filename, summary in available.items():
+            if stack in (filename, Path(filename).stem, summary['name']):
+                return filename
+        raise ValueError(f"Unknown tech stack for {app_type}: {stack}")
+    
     def _get_project_name(self) -> str:
         """Get project name from user or args."""
         if self.args and self.args.name:
@@ -122,9 +572,8 @@ class ProjectWizard:
         # If using command line args, use first available stack
         if self.args and (self.args.name or self.args.type):
             filename = list(available_stacks.keys())[0]
-            selected_stack = available_stacks[filename]
-            print(f"\n⚙️  Using default tech stack: {selected_stack['name']}")
-            return selected_stack
+            print(f"\n⚙️  Using default tech stack: {available_stacks[filename]['name']}")
+            return self._load_tech_stack(filename)
         
         print(f"\n⚙️  Available tech stacks for {app_type}:")
         for i, (filename, stack_info) in enumerate(available_stacks.items(), 1):
@@ -135,7 +584,7 @@ class ProjectWizard:
                 choice = int(input(f"\nSelect tech stack (1-{len(available_stacks)}): "))
                 if 1 <= choice <= len(available_stacks):
                     filename = list(available_stacks.keys())[choice - 1]
-                    return available_stacks[filename]
+                    return self._load_tech_stack(filename)
                 print(f"❌ Please enter a number between 1-{len(available_stacks)}")
             except ValueError:
                 print("❌ Please enter a valid number")
@@ -145,21 +594,26 @@ class ProjectWizard:
                 sys.exit(1)
     
     def _get_available_tech_stacks(self, app_type: str) -> Dict[str, Dict]:
-        """Get available tech stacks for the application type."""
-        stacks = {}
-        
-        for stack_file in self.tech_stacks_path.glob("*.yaml"):
-            try:
-                with open(stack_file, 'r') as f:
-                    stack_info = yaml.safe_load(f)
-                    
-                if app_type in stack_info.get('application_types', []):
-                    stacks[stack_file.name] = stack_info
-                    
-            except Exception as e:
-                print(f"⚠️  Error loading {stack_file}: {e}")
-        
-        return stacks
+        """Get summaries (name, description) of the tech stacks for the application type."""
+        return self.stack_registry.stacks_for_type(app_type)
+    
+    def _load_tech_stack(self, filename: str) -> Optional[Dict]:
+        """Load the full profile of the selected tech stack."""
+        try:
+            return self.stack_registry.load(filename)
+        except Exception as e:
+            print(f"⚠️  Error loading {self.tech_stacks_path / filename}: {e}")
+            return None
+    
+    def list_tech_stacks(self) -> None:
+        """Print the tech stacks available for each application type."""
+        stacks = self.stack_registry.stacks()
+        app_types = sorted({app_type for summary in stacks.values()
+                            for app_type in summary['application_types']})
+        for app_type in app_types:
+            print(f"\n⚙️  {app_type}:")
+            for filename, summary in self.stack_registry.stacks_for_type(app_type).items():
+                print(f"  {summary['name']} ({filename}) - {summary['description']}")
     
     def _get_project_path(self, project_name: str) -> Path:
         """Get project path from user or use default."""
@@ -181,58 +635,111 @@ class ProjectWizard:
             print("💡 Use command line arguments: python tools/project_wizard.py --name PROJECT_NAME --type TYPE")
             sys.exit(1)
     
-    def _create_project_structure(self, project_path: Path) -> None:
-        """Create the basic project directory structure."""
-        if project_path.exists():
-            # If using command line args, auto-continue if directory exists
-            if self.args and (self.args.name or self.args.type):
-                print(f"\n⚠️  Directory {project_path} already exists. Continuing...")
-            else:
-                try:
-                    response = input(f"\n⚠️  Directory {project_path} already exists. Continue? (y/N): ")
-                    if response.lower() != 'y':
-                        print("❌ Project creation cancelled")
-                        sys.exit(1)
-                except EOFError:
-                    print("\n❌ Error: No input available. Please run this wizard in an interactive terminal.")
-                    print("💡 Use command line arguments: python tools/project_wizard.py --name PROJECT_NAME --type TYPE")
-                    sys.exit(1)
-        
-        # Create deliverables structure
-        deliverables_path = project_path / "deliverables"
-        for subdir in ["src", "test", "docs"]:
-            (deliverables_path / subdir).mkdir(parents=True, exist_ok=True)
+    def _structure(self, project_name: str, tech_stack: Optional[Dict],
+                   outputs: Dict[str, str]) -> Tuple[List[str], List[str]]:
+        """Return the project's directories and starter files.
         
-        print(f"📁 Created project structure at {project_path}")
+        These are the deliverables directories plus the stack's
+        project_structure laid out under deliverables/, leaving out files
+        the wizard generates itself.
+        """
+        directories = [f"deliverables/{subdir}" for subdir in DELIVERABLE_DIRS]
+        files = []
+        if tech_stack and tech_stack.get('project_structure'):
+            stack_directories, stack_files = _expand_structure(tech_stack['project_structure'], project_name)
+            directories += [f"deliverables/{path}" for path in stack_directories]
+            files += [f"deliverables/{path}" for path in stack_files if f"deliverables/{path}" not in outputs]
+        
+        # Only leaf directories need creating; makedirs creates their parents
+        unique = sorted(set(directories))
+        directories = [path for index, path in enumerate(unique)
+                       if index + 1 == len(unique) or not unique[index + 1].startswith(f"{path}/")]
+        for path in files:
+            parent = path.rpartition("/")[0]
+            if parent not in directories:
+                directories.append(parent)
+        return directories, files
     
-    def _generate_prd(self, project_path: Path, project_name: str, app_type: str) -> None:
-        """Generate PRD from template."""
-        template_file = self.templates_path / f"{app_type}_prd_template.md"
+    def _materialize_project(self, project_path: Path, directories: List[str], files: List[str],
+                             plan: Dict[str, Dict]) -> None:
+        """Build a new project in a staging directory and move it into place with one rename.
         
-        if not template_file.exists():
-            print(f"⚠️  PRD template not found for {app_type}")
-            return
+        An interrupted or failed run leaves no partial project behind.
+        """
+        project_path.parent.mkdir(parents=True, exist_ok=True)
+        staging_path = project_path.with_name(f".{project_path.name}.staging-{os.getpid()}")
+        try:
+            self._write_structure(staging_path, directories, files)
+            self._apply_plan(project_path, plan, staging_path)
+            os.rename(staging_path, project_path)
+        except BaseException:
+            shutil.rmtree(staging_path, ignore_errors=True)
+            raise
+        
+        print(f"📁 Created project structure at {project_path} "
+              f"({len(directories)} directories, {len(files) + len(plan)} files)")
+    
+    def _create_project_structure(self, project_path: Path, directories: List[str], files: List[str]) -> None:
+        """Add whatever is missing of the project structure to an existing project."""
+        # If using command line args, auto-continue if directory exists
+        if self.args and (self.args.name or self.args.type):
+            print(f"\n⚠️  Directory {project_path} already exists. Continuing...")
+        else:
+            try:
+                response = input(f"\n⚠️  Directory {project_path} already exists. Continue? (y/N): ")
+                if response.lower() != 'y':
+                    print("❌ Project creation cancelled")
+                    sys.exit(1)
+            except EOFError:
+                print("\n❌ Error: No input available. Please run this wizard in an interactive terminal.")
+                print("💡 Use command line arguments: python tools/project_wizard.py --name PROJECT_NAME --type TYPE")
+                sys.exit(1)
         
-        # Read template and replace project name
-        with open(template_file, 'r') as f:
-            content = f.read()
+        created = self._write_structure(project_path, directories, files)
+        if created:
+            print(f"📁 Added {created} missing files to the project structure at {project_path}")
+    
+    def _write_structure(self, root: Path, directories: List[str], files: List[str]) -> int:
+        """Create directories and any starter files not already present; return how many files were created."""
+        for path in directories:
+            os.makedirs(root / path, exist_ok=True)
         
-        content = content.replace("{PROJECT_NAME}", project_name)
+        created = 0
+        for path in files:
+            try:
+                # Exclusive create: files already in the project are never touched
+                fd = os.open(root / path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(STRUCTURE_BOILERPLATE.get(os.path.splitext(path)[1], ""))
+            created += 1
+        return created
+    
+    def _template(self, app_type: str) -> Optional[PrdTemplate]:
+        """Return the compiled PRD template for an application type (None if missing)."""
+        if app_type not in self._templates:
+            template_file = self.templates_path / f"{app_type}_prd_template.md"
+            self._templates[app_type] = PrdTemplate(template_file.read_text()) if template_file.exists() else None
+        return self._templates[app_type]
+    
+    def _prd_content(self, project_name: str, app_type: str,
+                     placeholders: Optional[Dict] = None) -> Tuple[Optional[str], List[str]]:
+        """Render the PRD from its template; return it and the placeholders left unfilled."""
+        template = self._template(app_type)
         
-        # Write PRD file
-        prd_path = project_path / "deliverables" / "PRD.md"
-        with open(prd_path, 'w') as f:
-            f.write(content)
+        if template is None:
+            print(f"⚠️  PRD template not found for {app_type}")
+            return None, []
         
-        print(f"📄 Generated PRD template: {prd_path}")
+        # Shared answers, then this project's own values
+        values = {**self.answers, **(placeholders or {}), "PROJECT_NAME": project_name}
+        return template.render(values), template.missing(values)
     
-    def _setup_tech_stack(self, project_path: Path, tech_stack: Optional[Dict]) -> None:
-        """Setup technology stack files."""
+    def _requirements_content(self, tech_stack: Optional[Dict]) -> Optional[str]:
+        """Build requirements.txt from the tech stack's dependencies (None if there are none)."""
         if not tech_stack:
-            return
-        
-        # Create requirements.txt with dependencies
-        requirements_path = project_path / "deliverables" / "requirements.txt"
+            return None
         
         dependencies = []
         if 'dependencies' in tech_stack:
@@ -248,19 +755,13 @@ class ProjectWizard:
             backend_deps = tech_stack['dependencies']['backend']
             dependencies.extend(backend_deps)
         
-        if dependencies:
-            with open(requirements_path, 'w') as f:
-                f.write(f"# {tech_stack['name']} Dependencies\\n")
-                f.write("\\n".join(dependencies))
-            
-            print(f"📦 Created requirements.txt with {len(dependencies)} dependencies")
+        if not dependencies:
+            return None
+        return f"# {tech_stack['name']} Dependencies\\n" + "\\n".join(dependencies)
     
-    def _create_framework_link(self, project_path: Path) -> None:
-        """Create link to framework for development guidance."""
-        claude_md_path = project_path / "CLAUDE.md"
-        
-        # Create a CLAUDE.md that imports the framework development guide
-        content = f"""# Development Guide
+    def _claude_md_content(self) -> str:
+        """Build a CLAUDE.md that imports the framework development guide."""
+        return f"""# Development Guide
 
 This project uses the Claude Code Automation Framework for systematic development.
 
@@ -275,11 +776,101 @@ This project uses the Claude Code Automation Framework for systematic developmen
 
 For detailed guidance, see the framework development guide.
 """
+    
+    def _plan_outputs(self, project_path: Path, outputs: Dict[str, str]) -> Dict[str, Dict]:
+        """Decide what to do with each output, comparing content hashes.
         
-        with open(claude_md_path, 'w') as f:
-            f.write(content)
+        A file is created if missing, left alone if already identical, and
+        updated only if it still matches what the wizard last wrote there;
+        files edited since (or not written by the wizard) are kept.
+        """
+        recorded = self._read_generation_manifest(project_path)
+        plan = {}
+        for path, content in outputs.items():
+            digest = _content_hash(content.encode())
+            try:
+                current = _content_hash((project_path / path).read_bytes())
+            except FileNotFoundError:
+                action = "create"
+            else:
+                if current == digest:
+                    action = "unchanged"
+                elif current == recorded.get(path):
+                    action = "update"
+                else:
+                    action = "keep"
+            plan[path] = {'action': action, 'content': content, 'digest': digest}
+        return plan
+    
+    def _apply_plan(self, project_path: Path, plan: Dict[str, Dict],
+                    staging_path: Optional[Path] = None) -> None:
+        """Write the created and updated outputs and record their hashes.
         
-        print(f"🔗 Created framework integration: {claude_md_path}")
+        With a staging directory (a new project not yet moved into place)
+        files are written there directly, since nothing can observe them
+        half-written.
+        """
+        write = _write_atomic if staging_path is None else Path.write_text
+        root = staging_path or project_path
+        recorded = self._read_generation_manifest(project_path)
+        hashes = dict(recorded)
+        for path, entry in plan.items():
+            target = project_path / path
+            if entry['action'] == "keep":
+                print(f"⚠️  Kept {target}: edited since it was generated")
+                continue
+            hashes[path] = entry['digest']
+            if entry['action'] == "unchanged":
+                continue
+            write(root / path, entry['content'])
+            print(f"{'📄 Created' if entry['action'] == 'create' else '🔄 Updated'} {target}")
+        
+        if hashes != recorded:
+            manifest = {'version': GENERATION_MANIFEST_VERSION, 'files': hashes}
+            write(root / GENERATION_MANIFEST, json.dumps(manifest, indent=1, sort_keys=True) + "\n")
+    
+    def _read_generation_manifest(self, project_path: Path) -> Dict[str, str]:
+        """Return the content hashes recorded in a project (none if it has no manifest)."""
+        try:
+            with open(project_path / GENERATION_MANIFEST, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifest, dict) or manifest.get('version') != GENERATION_MANIFEST_VERSION:
+            return {}
+        return manifest.get('files', {})
+
+
+# Wizard shared by the projects a worker process generates
+_worker_wizard = None
+
+
+def _init_worker(wizard: ProjectWizard) -> None:
+    """Process pool initializer: keep the parent's preloaded wizard."""
+    global _worker_wizard
+    _worker_wizard = wizard
+
+
+def _generate_in_worker(spec: Dict) -> Dict:
+    """Generate one manifest project in a worker process."""
+    return _generate_project(_worker_wizard, spec)
+
+
+def _generate_project(wizard: ProjectWizard, spec: Dict) -> Dict:
+    """Generate one manifest project and report how long it took."""
+    start = perf_counter()
+    error = None
+    result = {'missing': [], 'written': 0, 'kept': [], 'actions': []}
+    try:
+        # Per-file progress lines would interleave across projects
+        with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            tech_stack = wizard.stack_registry.load(spec['stack']) if spec['stack'] else None
+            result = wizard.create_project(spec['path'], spec['name'], spec['type'], tech_stack,
+                                           spec['placeholders'])
+    except Exception as e:
+        error = str(e)
+    return {'name': spec['name'], 'path': str(spec['path']), 'seconds': perf_counter() - start,
+            'error': error, **result}
 
 
 def main():
@@ -292,6 +883,9 @@ Examples:
   python tools/project_wizard.py                          # Interactive mode
   python tools/project_wizard.py --name my_app           # CLI tool with default type
   python tools/project_wizard.py --name my_api --type api_service   # REST API
+  python tools/project_wizard.py --list-stacks           # Tech stacks per application type
+  python tools/project_wizard.py --manifest projects.yaml --jobs 8  # Bulk generation
+  python tools/project_wizard.py --name my_cli --answers answers.yaml --set USER_TYPE=developer
   
 Application types:
   web_app, cli_tool, api_service, ml_system, trading_dashboard
@@ -304,15 +898,57 @@ Application types:
     )
     parser.add_argument(
         "--type", 
-        choices=["web_app", "cli_tool", "api_service", "ml_system", "trading_dashboard"],
+        choices=APPLICATION_TYPES,
         default="cli_tool",
         help="Application type (default: cli_tool)"
     )
     
+    parser.add_argument(
+        "--answers",
+        type=Path,
+        help="YAML/JSON mapping of PRD placeholder values (e.g. PROBLEM_DESCRIPTION)"
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        metavar="KEY=VALUE",
+        help="PRD placeholder value; repeatable, overrides --answers"
+    )
+    
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show which files would be created or updated without writing anything"
+    )
+    
+    parser.add_argument(
+        "--list-stacks",
+        action="store_true",
+        help="List the tech stacks available for each application type and exit"
+    )
+    
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help="YAML/JSON list of projects (name, type, stack, placeholders, path) to generate"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Worker processes for --manifest (default: CPU count)"
+    )
+    
     args = parser.parse_args()
     
     wizard = ProjectWizard(args)
+    if args.list_stacks:
+        wizard.list_tech_stacks()
+        return
+    
     try:
+        wizard.load_answers(args.answers, args.set)
+        if args.manifest:
+            sys.exit(wizard.run_manifest(args.manifest, args.jobs))
         wizard.run()
     except KeyboardInterrupt:
         print("\\n\\n👋 Project creation cancelled")
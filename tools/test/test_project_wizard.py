@@ -0,0 +1,380 @@
+"""
+Project Wizard Tests
+Generation, incremental regeneration, stack index and project structure.
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import project_wizard
+from project_wizard import GENERATION_MANIFEST, PrdTemplate, ProjectWizard, TechStackRegistry
+
+
+def make_wizard(tmp_path, dry_run=False):
+    """Wizard in non-interactive mode with its stack index kept under tmp_path."""
+    wizard = ProjectWizard(argparse.Namespace(name="demo", type="ml_system", dry_run=dry_run))
+    wizard.stack_registry = TechStackRegistry(wizard.tech_stacks_path, tmp_path / "stack_index.json")
+    return wizard
+
+
+def create(wizard, project_path, **placeholders):
+    """Create or update the demo ML project."""
+    tech_stack = wizard.stack_registry.load("ml_system_python.yaml")
+    return wizard.create_project(project_path, "demo", "ml_system", tech_stack, placeholders)
+
+
+def mtimes(project_path):
+    """Modification times of every file in a project."""
+    return {path: path.stat().st_mtime_ns for path in project_path.rglob("*") if path.is_file()}
+
+
+class TestIncrementalRegeneration:
+    """Test the content-hash plan for generated files."""
+    
+    def test_first_run_creates_and_records_hashes(self, tmp_path):
+        """Test a new project gets every output and a manifest of their hashes."""
+        project = tmp_path / "demo"
+        result = create(make_wizard(tmp_path), project, PRIMARY_GOAL="Ship it")
+        
+        assert result['written'] == 3 and result['kept'] == []
+        assert "Ship it" in (project / "deliverables" / "PRD.md").read_text()
+        manifest = json.loads((project / GENERATION_MANIFEST).read_text())
+        assert manifest['version'] == project_wizard.GENERATION_MANIFEST_VERSION
+        recorded = manifest['files']
+        assert sorted(recorded) == ["CLAUDE.md", "deliverables/PRD.md", "deliverables/requirements.txt"]
+        assert recorded["CLAUDE.md"] == project_wizard._content_hash((project / "CLAUDE.md").read_bytes())
+    
+    def test_rerun_writes_nothing(self, tmp_path):
+        """Test regenerating an unchanged project leaves every file and mtime alone."""
+        project = tmp_path / "demo"
+        create(make_wizard(tmp_path), project)
+        before = mtimes(project)
+        
+        result = create(make_wizard(tmp_path), project)
+        assert result['written'] == 0
+        assert {action for action, _ in result['actions']} == {"unchanged"}
+        assert mtimes(project) == before
+    
+    def test_edited_file_is_kept_and_others_update(self, tmp_path):
+        """Test edits survive regeneration while untouched outputs still update."""
+        project = tmp_path / "demo"
+        create(make_wizard(tmp_path), project)
+        prd = project / "deliverables" / "PRD.md"
+        claude_md = project / "CLAUDE.md"
+        prd.write_text("My own PRD\n")
+        recorded = ProjectWizard()._read_generation_manifest(project)
+        
+        wizard = make_wizard(tmp_path)
+        wizard.framework_path = tmp_path / "framework"  # Changes CLAUDE.md
+        os.chmod(claude_md, 0o640)
+        result = create(wizard, project, PRIMARY_GOAL="New goal")
+        
+        assert result['kept'] == ["deliverables/PRD.md"]
+        assert prd.read_text() == "My own PRD\n"
+        assert str(tmp_path / "framework") in claude_md.read_text()
+        assert claude_md.stat().st_mode & 0o777 == 0o640  # Atomic replace keeps the mode
+        assert not list(project.glob(".*.tmp"))
+        
+        updated = ProjectWizard()._read_generation_manifest(project)
+        assert updated["deliverables/PRD.md"] == recorded["deliverables/PRD.md"]
+        assert updated["CLAUDE.md"] != recorded["CLAUDE.md"]
+    
+    def test_dry_run_writes_nothing(self, tmp_path, capsys):
+        """Test --dry-run reports the plan without creating or changing files."""
+        project = tmp_path / "demo"
+        result = create(make_wizard(tmp_path, dry_run=True), project)
+        assert not project.exists()
+        assert ("create", "deliverables/PRD.md") in result['actions']
+        assert f"create     {project / 'CLAUDE.md'}" in capsys.readouterr().out
+        
+        create(make_wizard(tmp_path), project)
+        before = mtimes(project)
+        result = create(make_wizard(tmp_path, dry_run=True), project, PRIMARY_GOAL="Changed")
+        assert ("update", "deliverables/PRD.md") in result['actions']
+        assert mtimes(project) == before
+
+
+class TestPrdTemplate:
+    """Test PRD placeholder rendering and answers loading."""
+    
+    def test_render_fills_scalar_and_list_answers(self):
+        """Test every occurrence is filled in one pass and lists are comma-joined."""
+        template = PrdTemplate("# {PROJECT_NAME}\nFor {USER_TYPE}. {PROJECT_NAME} does {GOAL}.\n")
+        values = {key: project_wizard._placeholder_value(value) for key, value in
+                  {'PROJECT_NAME': "demo", 'USER_TYPE': ["analysts", "traders"], 'GOAL': "{PROJECT_NAME}"}.items()}
+        
+        assert template.placeholders == ["PROJECT_NAME", "USER_TYPE", "GOAL"]
+        assert template.render(values) == "# demo\nFor analysts, traders. demo does {PROJECT_NAME}.\n"
+        assert template.segments[::2] == ["# ", "\nFor ", ". ", " does ", ".\n"]
+    
+    def test_missing_reports_unanswered_placeholders(self):
+        """Test unanswered placeholders are reported once, in order, and left in the text."""
+        template = PrdTemplate("{B} {A} {B} {lower} {C_2}")
+        
+        assert template.missing({'A': "a"}) == ["B", "C_2"]
+        assert template.missing({'A': "a", 'B': "b", 'C_2': "c"}) == []
+        assert template.render({'A': "a"}) == "{B} a {B} {lower} {C_2}"
+    
+    @pytest.mark.parametrize("filename, text", [
+        ("answers.yaml", "USER_TYPE: developers\nPRIMARY_GOAL: Ship it\nTAGS:\n  - fast\n  - small\n"),
+        ("answers.json", '{"USER_TYPE": "developers", "PRIMARY_GOAL": "Ship it", "TAGS": ["fast", "small"]}'),
+    ])
+    def test_load_answers_from_file(self, tmp_path, filename, text):
+        """Test answers load from YAML and JSON files alike."""
+        answers_path = tmp_path / filename
+        answers_path.write_text(text)
+        wizard = ProjectWizard()
+        wizard.load_answers(answers_path)
+        
+        assert wizard.answers == {'USER_TYPE': "developers", 'PRIMARY_GOAL': "Ship it", 'TAGS': "fast, small"}
+    
+    def test_set_overrides_file_answer(self, tmp_path):
+        """Test --set assignments override the answers file and may contain '='."""
+        answers_path = tmp_path / "answers.yaml"
+        answers_path.write_text("USER_TYPE: developers\nPRIMARY_GOAL: Ship it\n")
+        wizard = make_wizard(tmp_path)
+        wizard.load_answers(answers_path, ["USER_TYPE=analysts", " LATENCY_METRIC =p99=50ms"])
+        
+        assert wizard.answers == {'USER_TYPE': "analysts", 'PRIMARY_GOAL': "Ship it", 'LATENCY_METRIC': "p99=50ms"}
+        
+        project = tmp_path / "demo"
+        create(wizard, project)
+        assert "analysts" in (project / "deliverables" / "PRD.md").read_text()
+    
+    def test_set_without_equals_is_rejected(self):
+        """Test a --set value with no '=' is an error."""
+        with pytest.raises(ValueError, match="Expected KEY=VALUE, got: USER_TYPE"):
+            ProjectWizard().load_answers(None, ["PRIMARY_GOAL=x", "USER_TYPE"])
+
+
+class TestTechStackRegistry:
+    """Test the stack summary scanner and the persistent stack index."""
+    
+    def test_scanner_matches_yaml_on_shipped_profiles(self):
+        """Test the summary scanner agrees with yaml.safe_load on every shipped profile."""
+        yaml = pytest.importorskip("yaml")
+        profiles = sorted((Path(project_wizard.__file__).parent.parent / "tech_stacks").glob("*.yaml"))
+        assert profiles
+        for profile in profiles:
+            text = profile.read_text()
+            expected = yaml.safe_load(text)
+            summary = project_wizard._scan_stack_summary(text)
+            assert summary == {key: expected[key] for key in project_wizard.STACK_SUMMARY_KEYS}
+    
+    @pytest.mark.parametrize("text", [
+        'name: "A"\ndescription: "B"\napplication_types:\n  - "cli_tool"\n',  # Block list
+        'name: "A \\"quoted\\""\ndescription: "B"\napplication_types: ["cli_tool"]\n',
+        "name: A # comment\ndescription: B\napplication_types: [cli_tool]\n",
+        "name: true\ndescription: B\napplication_types: [cli_tool]\n",
+        'name: "A"\napplication_types: ["cli_tool"]\n',  # Missing key
+    ])
+    def test_scanner_falls_back_on_other_yaml(self, text):
+        """Test anything outside the flat subset is left to the YAML parser."""
+        assert project_wizard._scan_stack_summary(text) is None
+    
+    def test_only_touched_files_are_reindexed(self, tmp_path, monkeypatch):
+        """Test mtime/size trust an entry, and a touched file is re-read only if its hash changed."""
+        stacks = tmp_path / "stacks"
+        stacks.mkdir()
+        for name, app_type in (("one", "cli_tool"), ("two", "web_app")):
+            (stacks / f"{name}.yaml").write_text(
+                f'name: "{name}"\ndescription: "d"\napplication_types: ["{app_type}"]\n')
+        index = tmp_path / "index.json"
+        assert list(TechStackRegistry(stacks, index).stacks_for_type("web_app")) == ["two.yaml"]
+        
+        indexed = []
+        original = TechStackRegistry._index_file
+        monkeypatch.setattr(TechStackRegistry, "_index_file",
+                            lambda self, filename, *args: indexed.append(filename) or original(self, filename, *args))
+        
+        TechStackRegistry(stacks, index).stacks()
+        assert indexed == []
+        
+        os.utime(stacks / "one.yaml", ns=(1, 1))  # Touched, same content
+        scans = []
+        monkeypatch.setattr(project_wizard, "_scan_stack_summary", lambda text: scans.append(text))
+        assert TechStackRegistry(stacks, index).stacks()["one.yaml"]["name"] == "one"
+        assert indexed == ["one.yaml"] and scans == []
+        monkeypatch.undo()
+        
+        (stacks / "two.yaml").write_text('name: "Two"\ndescription: "d"\napplication_types: ["api_service"]\n')
+        registry = TechStackRegistry(stacks, index)
+        assert list(registry.stacks_for_type("api_service")) == ["two.yaml"]
+        assert registry.stacks_for_type("web_app") == {}
+    
+    def test_list_stacks_does_not_import_yaml(self):
+        """Test --list-stacks answers from the index without importing yaml."""
+        import subprocess
+        
+        framework_dir = Path(project_wizard.__file__).parent.parent
+        script = ("import sys, runpy; sys.argv = ['tools/project_wizard.py', '--list-stacks']\n"
+                  "runpy.run_path('tools/project_wizard.py', run_name='__main__')\n"
+                  "print('yaml' if 'yaml' in sys.modules else 'no-yaml')")
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                                cwd=framework_dir)
+        assert result.returncode == 0, result.stderr
+        assert "Python CLI Tool" in result.stdout
+        assert result.stdout.split()[-1] == "no-yaml"
+
+
+class TestProjectStructure:
+    """Test expanding and materializing a stack's project_structure."""
+    
+    def test_expand_ml_system_structure(self, tmp_path):
+        """Test the indented tree expands to nested directories and files."""
+        tech_stack = make_wizard(tmp_path).stack_registry.load("ml_system_python.yaml")
+        directories, files = project_wizard._expand_structure(tech_stack['project_structure'], "demo")
+        
+        assert directories[:3] == ["src/demo", "src/demo/data", "src/demo/models"]
+        assert "data/raw" in directories and "mlruns" in directories
+        assert "src/demo/data/loader.py" in files
+        assert "src/demo/utils/visualization.py" in files
+        assert "notebooks/model_development.ipynb" in files
+        assert "requirements.txt" in files
+    
+    @pytest.mark.parametrize("entry", ["../escape.py", "/etc/passwd", "  ../../up/", "  {project_name}/../../x.py"])
+    def test_expand_rejects_escaping_entries(self, entry):
+        """Test entries leaving the project are rejected."""
+        with pytest.raises(ValueError):
+            project_wizard._expand_structure(["src/", entry], "demo")
+    
+    def test_new_project_is_staged_then_renamed(self, tmp_path):
+        """Test a new project appears complete with no staging directory left behind."""
+        project = tmp_path / "demo"
+        create(make_wizard(tmp_path), project)
+        
+        deliverables = project / "deliverables"
+        assert (deliverables / "src" / "demo" / "training" / "trainer.py").read_text() == ""
+        assert '"nbformat": 4' in (deliverables / "notebooks" / "exploratory_analysis.ipynb").read_text()
+        assert (deliverables / "data" / "processed").is_dir()
+        assert (deliverables / "test").is_dir()
+        assert "# Python ML System Dependencies" in (deliverables / "requirements.txt").read_text()
+        assert not list(tmp_path.glob(".demo.staging-*"))
+    
+    def test_failed_materialize_leaves_nothing(self, tmp_path, monkeypatch):
+        """Test a failure before the rename removes the staging directory."""
+        def fail(*args):
+            raise OSError("rename failed")
+        monkeypatch.setattr(project_wizard.os, "rename", fail)
+        
+        project = tmp_path / "demo"
+        with pytest.raises(OSError):
+            create(make_wizard(tmp_path), project)
+        assert not project.exists()
+        assert not list(tmp_path.glob(".demo.staging-*"))
+    
+    def test_existing_files_are_never_overwritten(self, tmp_path):
+        """Test rerunning adds missing starter files but keeps existing ones."""
+        project = tmp_path / "demo"
+        create(make_wizard(tmp_path), project)
+        loader = project / "deliverables" / "src" / "demo" / "data" / "loader.py"
+        trainer = project / "deliverables" / "src" / "demo" / "training" / "trainer.py"
+        loader.write_text("def load():\n    pass\n")
+        trainer.unlink()
+        
+        create(make_wizard(tmp_path), project)
+        assert loader.read_text() == "def load():\n    pass\n"
+        assert trainer.exists()
+
+
+def write_manifest(directory, projects):
+    """Write a YAML manifest of projects into directory and return its path."""
+    yaml = pytest.importorskip("yaml")
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_path = directory / "projects.yaml"
+    manifest_path.write_text(yaml.safe_dump({'projects': projects}))
+    return manifest_path
+
+
+def contents(root):
+    """Every file under root by relative path, with its bytes."""
+    return {str(path.relative_to(root)): path.read_bytes() for path in root.rglob("*") if path.is_file()}
+
+
+MANIFEST_PROJECTS = [
+    {'name': "alpha", 'type': "ml_system", 'placeholders': {'PRIMARY_GOAL': "Predict churn"}},
+    {'name': "beta", 'type': "cli_tool", 'path': "tools/beta", 'stack': "python_cli_tool"},
+    {'name': "gamma", 'type': "web_app", 'placeholders': {'USER_TYPE': ["analysts", "traders"]}},
+    {'name': "delta", 'type': "api_service"},
+]
+
+
+class TestManifest:
+    """Test bulk generation from a manifest."""
+    
+    def test_parallel_run_matches_serial_run(self, tmp_path):
+        """Test worker processes generate exactly what a single process does."""
+        serial = write_manifest(tmp_path / "serial", MANIFEST_PROJECTS)
+        parallel = write_manifest(tmp_path / "parallel", MANIFEST_PROJECTS)
+        
+        assert make_wizard(tmp_path).run_manifest(serial, jobs=1) == 0
+        assert make_wizard(tmp_path).run_manifest(parallel, jobs=3) == 0
+        
+        generated = contents(tmp_path / "parallel")
+        assert generated == contents(tmp_path / "serial")
+        assert "Predict churn" in generated["alpha/deliverables/PRD.md"].decode()
+        assert "analysts, traders" in generated["gamma/deliverables/PRD.md"].decode()
+        assert "tools/beta/CLAUDE.md" in generated
+    
+    def test_rerun_is_idempotent(self, tmp_path, capsys):
+        """Test rerunning a manifest writes nothing and leaves mtimes alone."""
+        manifest_path = write_manifest(tmp_path / "batch", MANIFEST_PROJECTS)
+        make_wizard(tmp_path).run_manifest(manifest_path, jobs=2)
+        before = mtimes(tmp_path / "batch")
+        capsys.readouterr()
+        
+        assert make_wizard(tmp_path).run_manifest(manifest_path, jobs=2) == 0
+        assert mtimes(tmp_path / "batch") == before
+        assert "4/4 projects generated" in capsys.readouterr().out
+    
+    def test_relative_paths_resolve_against_manifest(self, tmp_path, monkeypatch):
+        """Test project locations are relative to the manifest, not the working directory."""
+        manifest_path = write_manifest(tmp_path / "batch", MANIFEST_PROJECTS)
+        monkeypatch.chdir(tmp_path)
+        specs = make_wizard(tmp_path)._load_manifest(Path("batch") / "projects.yaml")
+        
+        assert [spec['path'] for spec in specs] == [
+            manifest_path.parent.resolve() / path for path in ("alpha", "tools/beta", "gamma", "delta")]
+        assert specs[2]['placeholders'] == {'USER_TYPE': "analysts, traders"}
+    
+    @pytest.mark.parametrize("projects, message", [
+        ([{'name': "alpha"}, {'name': "beta", 'path': "alpha"}], "share the location"),
+        ([{'name': "alpha"}, {'name': "./alpha", 'path': "x"}], "Invalid project name"),
+        ([{'name': "has space"}], "Invalid project name"),
+        ([{'name': ""}], "Invalid project name"),
+        ([{'name': "alpha", 'type': "desktop_app"}], "Invalid application type"),
+        ([], "does not list any projects"),
+    ])
+    def test_invalid_manifests_are_rejected(self, tmp_path, projects, message):
+        """Test duplicate locations, bad names and unknown types fail before generating."""
+        manifest_path = write_manifest(tmp_path / "batch", projects)
+        with pytest.raises(ValueError, match=message):
+            make_wizard(tmp_path).run_manifest(manifest_path, jobs=1)
+        assert sorted(path.name for path in (tmp_path / "batch").iterdir()) == ["projects.yaml"]
+    
+    @pytest.mark.parametrize("app_type, stack", [
+        ("cli_tool", "no_such_stack"),
+        ("cli_tool", "fastapi_microservice"),  # Exists, but only for api_service
+        ("ml_system", "Python CLI Tool"),
+    ])
+    def test_unknown_stack_is_rejected(self, tmp_path, app_type, stack):
+        """Test a stack must exist and support the project's application type."""
+        manifest_path = write_manifest(tmp_path / "batch", [{'name': "alpha", 'type': app_type, 'stack': stack}])
+        with pytest.raises(ValueError, match=f"Unknown tech stack for {app_type}: {stack}"):
+            make_wizard(tmp_path).run_manifest(manifest_path, jobs=1)
+        assert not (tmp_path / "batch" / "alpha").exists()
+    
+    def test_stack_by_filename_stem_or_name(self, tmp_path):
+        """Test a stack can be named by its filename, stem or display name."""
+        wizard = make_wizard(tmp_path)
+        for stack in ("python_cli_tool.yaml", "python_cli_tool", "Python CLI Tool", None):
+            assert wizard._resolve_stack("cli_tool", stack) == "python_cli_tool.yaml"
+        assert wizard._resolve_stack("trading_dashboard", "web_fullstack_react_python") == \
+            "web_fullstack_react_python.yaml"